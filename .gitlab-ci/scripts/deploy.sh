@@ -34,6 +34,8 @@ spec:
             value: "$HTTP_PROXY"
           - name: NO_PROXY
             value: "localhost,127.0.0.1,.cluster.local,.svc"
+          - name: NUM_PROXIES
+            value: "1"
         resources:
           requests:
             memory: "$MIN_MEMORY" 
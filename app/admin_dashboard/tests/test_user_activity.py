@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import CustomUser
+
+
+class UserActivityTests(APITestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            email='admin@example.com', username='admin', password='admin123', last_seen=now()
+        )
+        for days in (1, 20, 40, 200):
+            CustomUser.objects.create_user(
+                email=f'seen{days}@example.com', username=f'seen{days}', password='password123',
+                last_seen=now() - timedelta(days=days),
+            )
+        CustomUser.objects.create_user(email='never@example.com', username='never', password='password123')
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.url = reverse('admin_dashboard:user_activity')
+
+    def test_counts_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'window_days': 30})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], {'window_days': 30, 'active': 3, 'inactive': 3})
+
+    def test_default_window_matches_old_endpoints(self):
+        response = self.client.get(reverse('admin_dashboard:active_user_list'))
+        data = response.data['data']
+        self.assertEqual((data['window_days'], data['active'], data['inactive']), (150, 4, 2))
+        self.assertEqual(
+            [user['username'] for user in data['results']], ['admin', 'seen1', 'seen20', 'seen40']
+        )
+
+    def test_inactive_bucket_pages_include_never_logged_in(self):
+        usernames, cursor = [], None
+        while True:
+            params = {'bucket': 'inactive', 'window_days': 30, 'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(self.url, params).data['data']
+            usernames += [user['username'] for user in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(usernames, ['seen40', 'seen200', 'never'])
+
+    def test_buckets_follow_last_seen_not_last_login(self):
+        CustomUser.objects.filter(username='seen200').update(last_login=now())
+        CustomUser.objects.filter(username='seen1').update(last_login=now() - timedelta(days=400))
+        data = self.client.get(self.url, {'window_days': 30}).data['data']
+        self.assertEqual((data['active'], data['inactive']), (3, 3))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'window_days': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'window_days': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'bucket': 'dormant'}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import CustomUser
+
+
+class AdminUserListTests(APITestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            email='admin@example.com', username='admin', password='admin123'
+        )
+        self.users = []
+        for i in range(5):
+            user = CustomUser.objects.create_user(
+                email=f'member{i}@example.com', username=f'member{i}', full_name=f'Member Number {i}',
+                password='password123', last_login=now() - timedelta(days=i * 30) if i else None,
+            )
+            CustomUser.objects.filter(id=user.id).update(date_joined=now() - timedelta(days=10 - i))
+            self.users.append(user)
+        CustomUser.objects.filter(id=self.users[4].id).update(is_active=False)
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.url = reverse('admin_dashboard:user_list')
+
+    def get(self, **params):
+        return self.client.get(self.url, params)
+
+    def collect_pages(self, **params):
+        usernames, cursor = [], None
+        while True:
+            response = self.get(**params, **({'cursor': cursor} if cursor else {}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            usernames += [user['username'] for user in response.data['data']['results']]
+            cursor = response.data['data']['next_cursor']
+            if not cursor:
+                return usernames
+
+    def test_pages_follow_sort_key(self):
+        self.assertEqual(
+            self.collect_pages(sort='date_joined', page_size=2),
+            ['member0', 'member1', 'member2', 'member3', 'member4', 'admin'],
+        )
+        # Belum pernah login dianggap paling lama
+        self.assertEqual(
+            self.collect_pages(sort='-last_login', page_size=2, is_staff='false'),
+            ['member1', 'member2', 'member3', 'member4', 'member0'],
+        )
+
+    def test_invalid_sort_and_filter_are_rejected(self):
+        self.assertEqual(self.get(sort='password').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(is_active='maybe').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(joined_from='yesterday').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(joined_from='2024-02-30').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(last_login_to='2024-02-30T10:00:00').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filters_combine_with_exact_count(self):
+        response = self.get(is_active='true', is_staff='false', last_login_from=(now() - timedelta(days=70)).date())
+        data = response.data['data']
+        self.assertEqual({user['username'] for user in data['results']}, {'member1', 'member2'})
+        self.assertEqual(data['count'], 2)
+        self.assertFalse(data['count_is_approximate'])
+
+        response = self.get(search='number 3')
+        self.assertEqual([user['username'] for user in response.data['data']['results']], ['member3'])
+        response = self.get(search='MEMBER2@example.com')
+        self.assertEqual([user['username'] for user in response.data['data']['results']], ['member2'])
+
+    def test_unfiltered_count_uses_planner_estimate(self):
+        with patch('utils.EXACT_COUNT_THRESHOLD', 0), connection.cursor() as cursor:
+            cursor.execute("ANALYZE authentication_customuser")
+            response = self.get()
+        self.assertTrue(response.data['data']['count_is_approximate'])
+        self.assertEqual(response.data['data']['count'], 6)
+
+    def test_unused_columns_are_not_fetched(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        user_query = next(query['sql'] for query in queries if 'ORDER BY' in query['sql'])
+        self.assertNotIn('"password"', user_query)
+        self.assertNotIn('"bio"', user_query)
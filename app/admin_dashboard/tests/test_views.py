@@ -18,13 +18,15 @@ class TestAdminDashboard(APITestCase):
             email='inactive@example.com',
             username='inactive_user',
             password='password123',
-            last_login=now() - timedelta(days=6 * 30)  # Lebih dari 5 bulan
+            last_login=now() - timedelta(days=6 * 30),  # Lebih dari 5 bulan
+            last_seen=now() - timedelta(days=6 * 30)
         )
         self.active_user = CustomUser.objects.create_user(
             email='active@example.com',
             username='active_user',
             password='password123',
-            last_login=now()
+            last_login=now(),
+            last_seen=now()
         )
 
         self.client.force_authenticate(user=self.admin_user)
@@ -35,12 +37,16 @@ class TestAdminDashboard(APITestCase):
     def test_get_all_users(self):
         response = self.client.get(self.all_users_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 3)  # Total 3 user dari setUp
+        self.assertEqual(len(response.data['data']['results']), 3)  # Total 3 user dari setUp
+        self.assertEqual(response.data['data']['count'], 3)
 
     def test_get_inactive_users(self):
         response = self.client.get(self.inactive_users_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 1)  # Hanya 1 user yang inactive
+        # inactive_user dan admin (belum pernah terlihat, last_seen NULL)
+        self.assertEqual(
+            {user['username'] for user in response.data['data']['results']}, {'inactive_user', 'admin'}
+        )
 
     def test_delete_user(self):
         response = self.client.delete(self.delete_user_url(self.inactive_user.id))
@@ -1,5 +1,10 @@
-from dateutil.relativedelta import relativedelta
-from django.utils.timezone import now
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Coalesce, Lower
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
 
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -7,30 +12,164 @@ from rest_framework.permissions import IsAdminUser
 
 from authentication.models import CustomUser
 from authentication.serializers import UserSerializer
-from utils import api_response
+from utils import InvalidCursor, api_response, approximate_count, get_page_size, keyset_paginate
+
+# Kunci sort yang diizinkan; id ikut sebagai tie-breaker supaya keyset punya urutan total
+USER_LIST_ORDERINGS = {
+    'date_joined': ('date_joined', 'id'),
+    '-date_joined': ('-date_joined', '-id'),
+    'username': ('username', 'id'),
+    '-username': ('-username', '-id'),
+    'last_login': ('last_login_order', 'id'),
+    '-last_login': ('-last_login_order', '-id'),
+    'last_seen': ('last_seen_order', 'id'),
+    '-last_seen': ('-last_seen_order', '-id'),
+}
+# last_login/last_seen NULL (belum pernah login/terlihat) dianggap paling lama
+NEVER_LOGGED_IN = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+class InvalidFilter(ValueError):
+    pass
+
+def _parse_bool(value):
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise InvalidFilter(value)
+
+def _parse_moment(value):
+    try:
+        moment = parse_datetime(value)
+        day = parse_date(value) if moment is None else None
+    except ValueError:
+        # Format benar tapi tanggal mustahil, mis. 2024-02-30
+        raise InvalidFilter(value)
+    if moment is None:
+        if day is None:
+            raise InvalidFilter(value)
+        moment = datetime.combine(day, time.min)
+    return make_aware(moment) if is_naive(moment) else moment
+
+def filter_users(users, params):
+    for param, field in (('is_active', 'is_active'), ('is_staff', 'is_staff')):
+        if params.get(param):
+            users = users.filter(**{field: _parse_bool(params[param])})
+
+    # *_from inklusif, *_to eksklusif
+    for param, lookup in (
+        ('joined_from', 'date_joined__gte'), ('joined_to', 'date_joined__lt'),
+        ('last_login_from', 'last_login__gte'), ('last_login_to', 'last_login__lt'),
+    ):
+        if params.get(param):
+            users = users.filter(**{lookup: _parse_moment(params[param])})
+
+    term = (params.get('search') or '').strip().lower()
+    if term:
+        if '@' in term:
+            users = users.alias(email_lower=Lower('email')).filter(email_lower=term)
+        else:
+            # LIKE '%term%' pada lower(...) memakai index GIN pg_trgm yang sama dengan pencarian teman
+            users = users.alias(username_lower=Lower('username'), full_name_lower=Lower('full_name')).filter(
+                Q(username_lower__contains=term) | Q(full_name_lower__contains=term)
+            )
+    return users
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def user_list(request):
-    users = CustomUser.objects.all()
-    serializer = UserSerializer(users, many=True)
-    return api_response(status.HTTP_200_OK, "List of all users", serializer.data)
+    ordering = USER_LIST_ORDERINGS.get(request.query_params.get('sort') or '-date_joined')
+    if ordering is None:
+        return api_response(status.HTTP_400_BAD_REQUEST, "Invalid sort key", {'allowed': list(USER_LIST_ORDERINGS)})
 
-@api_view(['GET'])
-@permission_classes([IsAdminUser])
-def active_users(request):
-    five_months_ago = now() - relativedelta(months=5)
-    active_users = CustomUser.objects.filter(last_login__gte=five_months_ago)
-    serializer = UserSerializer(active_users, many=True)
-    return api_response(status.HTTP_200_OK, "Users active in the last 5 months", serializer.data)
+    # Hanya kolom yang dipakai UserSerializer; password, bio, hex_color dst. tidak diambil
+    users = CustomUser.objects.only(*UserSerializer.Meta.fields)
+    try:
+        filtered = filter_users(users, request.query_params)
+    except InvalidFilter as e:
+        return api_response(status.HTTP_400_BAD_REQUEST, f"Invalid filter value '{e}'")
+    for field in ('last_login', 'last_seen'):
+        if f'{field}_order' in (key.lstrip('-') for key in ordering):
+            filtered = filtered.annotate(**{f'{field}_order': Coalesce(field, Value(NEVER_LOGGED_IN))})
+
+    try:
+        page, next_cursor = keyset_paginate(
+            filtered, ordering,
+            cursor=request.query_params.get('cursor'),
+            page_size=get_page_size(request),
+        )
+    except InvalidCursor:
+        return api_response(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+    # Tanpa filter total diambil dari statistik planner, dengan filter dihitung exact
+    if filtered.query.where:
+        count, approximate = filtered.count(), False
+    else:
+        count, approximate = approximate_count(CustomUser)
+
+    data = {
+        'results': UserSerializer(page, many=True).data,
+        'next_cursor': next_cursor,
+        'count': count,
+        'count_is_approximate': approximate,
+    }
+    return api_response(status.HTTP_200_OK, "List of all users", data)
+
+# Bucket aktivitas berdasarkan last_seen (authentication.activity), bukan last_login yang
+# hanya berubah saat login; siapa yang masuk hitungan relatif terhadap cutoff
+ACTIVITY_BUCKETS = {
+    'active': lambda cutoff: Q(last_seen__gte=cutoff),
+    # Belum pernah terlihat juga termasuk tidak aktif
+    'inactive': lambda cutoff: Q(last_seen__lt=cutoff) | Q(last_seen__isnull=True),
+}
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
-def inactive_users(request):
-    five_months_ago = now() - relativedelta(months=5)
-    inactive_users = CustomUser.objects.filter(last_login__lt=five_months_ago)
-    serializer = UserSerializer(inactive_users, many=True)
-    return api_response(status.HTTP_200_OK, "Users inactive for more than 5 months", serializer.data)
+def user_activity(request, bucket=None):
+    """
+    Active/inactive counts for a ``window_days`` window from one conditional aggregate. With a
+    bucket (``?bucket=`` or the URL kwarg of the old active-users/inactive-users routes), also
+    one keyset page of that bucket's users, most recently seen first.
+    """
+    options = settings.ADMIN_ACTIVITY
+    try:
+        window_days = int(request.query_params.get('window_days', options['WINDOW_DAYS']))
+    except ValueError:
+        window_days = 0
+    if not 1 <= window_days <= options['MAX_WINDOW_DAYS']:
+        return api_response(status.HTTP_400_BAD_REQUEST, f"window_days must be between 1 and {options['MAX_WINDOW_DAYS']}")
+
+    bucket = bucket or request.query_params.get('bucket')
+    if bucket is not None and bucket not in ACTIVITY_BUCKETS:
+        return api_response(status.HTTP_400_BAD_REQUEST, "Invalid bucket", {'allowed': list(ACTIVITY_BUCKETS)})
+
+    cutoff = now() - timedelta(days=window_days)
+    data = {'window_days': window_days}
+    data.update(CustomUser.objects.aggregate(**{
+        name: Count('id', filter=condition(cutoff)) for name, condition in ACTIVITY_BUCKETS.items()
+    }))
+    if bucket is None:
+        return api_response(status.HTTP_200_OK, f"User activity in the last {window_days} days", data)
+
+    users = CustomUser.objects.only(*UserSerializer.Meta.fields).filter(ACTIVITY_BUCKETS[bucket](cutoff))
+    if bucket == 'active':
+        # Tidak ada NULL di bucket ini, jadi urutan langsung lewat index last_seen
+        ordering = ('-last_seen', '-id')
+    else:
+        users = users.annotate(last_seen_order=Coalesce('last_seen', Value(NEVER_LOGGED_IN)))
+        ordering = ('-last_seen_order', '-id')
+    try:
+        page, next_cursor = keyset_paginate(
+            users, ordering,
+            cursor=request.query_params.get('cursor'),
+            page_size=get_page_size(request),
+        )
+    except InvalidCursor:
+        return api_response(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+    data['results'] = UserSerializer(page, many=True).data
+    data['next_cursor'] = next_cursor
+    return api_response(status.HTTP_200_OK, f"Users {bucket} in the last {window_days} days", data)
 
 @api_view(['DELETE'])
 @permission_classes([IsAdminUser])
@@ -0,0 +1,76 @@
+"""
+Batched ``CustomUser.last_seen`` tracking.
+
+``CookieJWTAuthentication`` calls ``last_seen_tracker.touch(user_id)`` on every authenticated
+request, which only records the time in memory. Once per ``LAST_SEEN["FLUSH_INTERVAL"]`` the
+request that finds the interval elapsed writes every pending user in a single UPDATE. Each
+user therefore costs at most one write per interval per process, however many requests
+they make.
+
+A flush is postponed while the connection is inside a transaction. Otherwise the UPDATE
+would hold user row locks until that transaction ends, and would be lost if it rolled
+back. Activity not yet flushed when a process exits is lost, at most one interval's worth.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class LastSeenTracker:
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flushed_at = time.monotonic()
+        self._flushing = False
+
+    def touch(self, user_id):
+        now = timezone.now()
+        with self._lock:
+            self._pending[int(user_id)] = now
+            due = not self._flushing and time.monotonic() - self._flushed_at >= self.interval
+        if due and not connection.in_atomic_block:
+            self.flush()
+
+    def flush(self):
+        """Write all pending ``last_seen`` values in one statement; returns the number of users."""
+        with self._lock:
+            if self._flushing:
+                return 0
+            pending, self._pending = self._pending, {}
+            self._flushing = True
+
+        try:
+            if pending:
+                # GREATEST: proses lain bisa saja sudah menulis waktu yang lebih baru
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE authentication_customuser AS u
+                        SET last_seen = GREATEST(u.last_seen, v.seen)
+                        FROM unnest(%s::bigint[], %s::timestamptz[]) AS v(id, seen)
+                        WHERE u.id = v.id
+                        """,
+                        [list(pending), list(pending.values())]
+                    )
+        except DatabaseError:
+            logger.exception("Flushing last_seen for %d users failed", len(pending))
+            # Dicoba lagi di flush berikutnya, kecuali user yang sudah tercatat lebih baru
+            with self._lock:
+                for user_id, seen in pending.items():
+                    self._pending.setdefault(user_id, seen)
+            return 0
+        finally:
+            with self._lock:
+                self._flushing = False
+                self._flushed_at = time.monotonic()
+        return len(pending)
+
+
+last_seen_tracker = LastSeenTracker(settings.LAST_SEEN["FLUSH_INTERVAL"])
@@ -1,5 +1,101 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from authentication.activity import last_seen_tracker
+from authentication.tokens import CLAIMS_VERSION_CLAIM, get_claims_version
+
+
+class UserCache:
+    """
+    Bounded per-process LRU of authenticated user rows with a TTL.
+    Only used when ``AUTH_USER_CACHE["ENABLED"]`` (by default, when a shared cache is configured).
+
+    Entries are stored with the user's version (see ``get_user_version``); an entry
+    is only served while that version is still current, so a save in any process
+    invalidates it as soon as the shared cache sees the new version. The TTL bounds
+    staleness when the shared cache is itself per process (LocMemCache).
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            entry_version, expires_at, user = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, version, user):
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE["MAX_SIZE"], settings.AUTH_USER_CACHE["TTL"])
+
+
+def _version_key(user_id):
+    return f"auth_user_version:{user_id}"
+
+def get_user_version(user_id):
+    return cache.get(_version_key(user_id), 0)
+
+def invalidate_cached_users(user_ids):
+    """
+    Drop cached user rows after the users changed, including ``queryset.update()``
+    writes that bypass post_save (saldo, friends_count, ...).
+    """
+    user_ids = [str(user_id) for user_id in user_ids]
+    if not user_ids:
+        return
+
+    def bump():
+        user_cache.discard(user_ids)
+        # Cukup hidup selama TTL entri: entri yang dibuat sebelum bump sudah kedaluwarsa saat kuncinya hilang
+        cache.set_many(
+            {_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, settings.AUTH_USER_CACHE["TTL"] * 2
+        )
+
+    bump()
+    # Dibump lagi setelah commit: request lain bisa saja membaca baris lama sebelum commit
+    transaction.on_commit(bump)
+
 
 class CookieJWTAuthentication(JWTAuthentication):
     """
@@ -15,18 +111,81 @@ class CookieJWTAuthentication(JWTAuthentication):
         if not token:
             return None
 
+        self.enforce_csrf(request)
+
         # Decode the JWT token and extract user information
         try:
-            print("=== Token dari Cookie ===")
-            print(token)
-
             validated_token = self.get_validated_token(token)
 
         except AuthenticationFailed as e:
             raise AuthenticationFailed(f'Token validation failed: {str(e)}')
-        
+
         try:
             user = self.get_user(validated_token)
-            return user, validated_token
         except AuthenticationFailed as e:
-            raise AuthenticationFailed(f'Error retrieving user: {str(e)}')
\ No newline at end of file
+            raise AuthenticationFailed(f'Error retrieving user: {str(e)}')
+
+        last_seen_tracker.touch(user.id)
+        return user, validated_token
+
+    def enforce_csrf(self, request):
+        """
+        Double-submit check: cookie JWTs are sent by the browser on cross-site requests too,
+        so unsafe methods must echo the readable CSRF cookie back in a header.
+        """
+        if not settings.JWT_CSRF_CHECK or request.method in SAFE_METHODS:
+            return
+        cookie = request.COOKIES.get(settings.JWT_CSRF_COOKIE_NAME)
+        header = request.META.get(settings.JWT_CSRF_HEADER_NAME)
+        if not cookie or not header or not constant_time_compare(cookie, header):
+            raise PermissionDenied('CSRF check failed')
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if not settings.AUTH_USER_CACHE["ENABLED"]:
+            return super().get_user(validated_token)
+
+        version = get_user_version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            # Lookup dan pengecekan bawaan simplejwt, lalu simpan barisnya
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, version, user)
+        else:
+            self.check_user(validated_token, user)
+
+        # Salinan per request, view boleh mengubah request.user tanpa mengotori cache
+        return copy.copy(user)
+
+    def check_user(self, validated_token, user):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+class CookieJWTClaimsAuthentication(CookieJWTAuthentication):
+    """
+    Stateless variant for views that only need the token claims (see ``authentication.tokens``).
+
+    While the token's claims version matches the user's current one, ``request.user`` is a
+    ``TokenUser`` built from the token without any query. Otherwise it falls back to the
+    user row, and the view should reissue the access token.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = validated_token.get(CLAIMS_VERSION_CLAIM)
+        if version and version == get_claims_version(user_id):
+            return TokenUser(validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,98 @@
+"""
+In-process bloom filter of blacklisted refresh-token JTIs.
+
+``ClaimsRefreshToken.check_blacklist`` asks the filter first and only queries
+``BlacklistedToken`` when the JTI might be in it, so refreshing a token that was never
+blacklisted (almost all of them) costs no query. A bloom filter has no false negatives,
+so a blacklisted JTI that the filter knows about is always checked against the database.
+
+Each process rebuilds its filter every ``REBUILD_INTERVAL`` seconds, and as soon as the
+generation key in the Django cache changes. Logout bumps that key after adding the JTI,
+so with a shared cache (``REDIS_URL``) every process picks up a logout on its next check.
+The per-process LocMemCache cannot tell other processes about a logout, so the filter is
+only used when ``TOKEN_BLACKLIST_FILTER["ENABLED"]`` (by default, when ``REDIS_URL`` is set);
+otherwise every JTI is reported as a possible match and checked against the database.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+GENERATION_KEY = "token_blacklist_generation"
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        # Double hashing: k posisi dari dua hash 64-bit
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._filter = None
+        self._generation = None
+        self._built_at = 0
+
+    def _is_stale(self, generation):
+        interval = settings.TOKEN_BLACKLIST_FILTER["REBUILD_INTERVAL"]
+        return self._filter is None or generation != self._generation or time.monotonic() - self._built_at > interval
+
+    def rebuild(self, generation=None):
+        options = settings.TOKEN_BLACKLIST_FILTER
+        # Token yang sudah kedaluwarsa ditolak lewat exp, tidak perlu masuk filter
+        jtis = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list('token__jti', flat=True)
+        jtis = list(jtis.iterator(chunk_size=options["CHUNK_SIZE"]))
+
+        bloom = BloomFilter(max(len(jtis) * 2, options["MIN_CAPACITY"]), options["ERROR_RATE"])
+        for jti in jtis:
+            bloom.add(jti)
+
+        with self._lock:
+            self._filter = bloom
+            self._generation = generation
+            self._built_at = time.monotonic()
+
+    def might_be_blacklisted(self, jti):
+        if not settings.TOKEN_BLACKLIST_FILTER["ENABLED"]:
+            return True
+        generation = cache.get(GENERATION_KEY)
+        if self._is_stale(generation):
+            with self._rebuild_lock:
+                if self._is_stale(generation):
+                    # Generasi dibaca sebelum query, blacklist baru selama rebuild memicu rebuild berikutnya
+                    self.rebuild(generation)
+        return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        # Setelah commit, baru proses lain membangun ulang filternya
+        transaction.on_commit(lambda: cache.set(GENERATION_KEY, uuid.uuid4().hex, None))
+
+
+blacklist_filter = BlacklistFilter()
@@ -0,0 +1,84 @@
+"""
+Bounded worker pool for password and hex-color hashing in the async auth views.
+
+PBKDF2 takes hundreds of milliseconds per call. The async views await it here instead of
+running it on the event loop (Django's ``acheck_password`` runs the hasher inline). The pool
+is a thread pool because ``hashlib.pbkdf2_hmac`` releases the GIL, so hashes run in parallel
+without pickling users across processes. At most ``MAX_WORKERS`` hashes run at once and at
+most ``MAX_QUEUE`` more wait. Beyond that, requests fail fast with 503 and ``Retry-After``
+instead of piling up behind the burst.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server is busy, try again shortly."
+    default_code = 'hashing_pool_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        # exception_handler DRF mengirim Retry-After dari atribut wait
+        self.wait = wait
+
+
+class HashingPool:
+    def __init__(self, max_workers, max_queue, retry_after=1):
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hashing')
+        # Slot = hash yang sedang jalan + yang antre
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy(self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_hashing_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                options = settings.PASSWORD_HASHING_POOL
+                _pool = HashingPool(options["MAX_WORKERS"], options["MAX_QUEUE"], options["RETRY_AFTER"])
+    return _pool
+
+
+async def amake_password(raw):
+    return await get_hashing_pool().run(make_password, raw)
+
+async def acheck_user_password(user, raw):
+    """Async ``user.check_password``, including the hash upgrade when the hasher changed."""
+    is_correct, must_update = await get_hashing_pool().run(verify_password, raw, user.password)
+    if is_correct and must_update:
+        user.password = await amake_password(raw)
+        await sync_to_async(user.save)(update_fields=['password'])
+    return is_correct
+
+async def acheck_hex_color(user, color):
+    """Async ``user.check_hex_color``."""
+    if not user.hex_color:
+        return False
+    is_correct, _ = await get_hashing_pool().run(verify_password, color, user.hex_color)
+    return is_correct
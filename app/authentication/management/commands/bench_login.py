@@ -0,0 +1,58 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from authentication.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login latency through the full request path, with the MD5 hasher so password "
+        "hashing does not dominate. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help="Number of logins to time")
+        parser.add_argument('--warmup', type=int, default=20, help="Untimed logins before measuring")
+
+    def handle(self, *args, **options):
+        rate_limits = {**settings.RATE_LIMITS, 'RATES': {
+            scope: (10 ** 9, window) for scope, (_, window) in settings.RATE_LIMITS['RATES'].items()
+        }}
+        with override_settings(
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+            ALLOWED_HOSTS=['testserver'],
+            RATE_LIMITS=rate_limits,
+        ), transaction.atomic():
+            CustomUser.objects.create_user(username='bench_login', email='bench_login@example.com', password='bench-pass')
+            client = Client()
+            url = reverse('authentication:login')
+            payload = {'username_or_email': 'bench_login', 'password': 'bench-pass'}
+
+            for _ in range(options['warmup']):
+                client.post(url, payload)
+
+            timings = []
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(max(options['iterations'], 1)):
+                    started = time.perf_counter()
+                    response = client.post(url, payload)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        self.stderr.write(f"Login failed with status {response.status_code}")
+                        break
+
+            transaction.set_rollback(True)
+
+        timings.sort()
+        self.stdout.write(self.style.SUCCESS(
+            f"login: mean {statistics.mean(timings):.2f} ms, p50 {timings[len(timings) // 2]:.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0]:.2f} ms, "
+            f"{len(queries.captured_queries) / len(timings):.1f} queries/login over {len(timings)} logins"
+        ))
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from authentication.models import CustomUser
+from authentication.tokens import ClaimsRefreshToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request latency of an API endpoint under the full middleware stack and the "
+        "sessionless API profile (SESSIONLESS_API). Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help="Requests timed per stack")
+        parser.add_argument('--path', help="API path to request (default: the user-info endpoint)")
+
+    def handle(self, *args, **options):
+        replacements = settings.SESSIONLESS_MIDDLEWARE_REPLACEMENTS
+        full = [middleware for middleware in settings.MIDDLEWARE]
+        full = [next((k for k, v in replacements.items() if v == middleware), middleware) for middleware in full]
+        stacks = {
+            'full': full,
+            'sessionless': [replacements.get(middleware, middleware) for middleware in full],
+        }
+        path = options['path'] or reverse('authentication:user_info')
+        iterations = max(options['iterations'], 1)
+
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(username='bench_mw', email='bench_mw@example.com', password='x')
+            access_token = str(ClaimsRefreshToken.for_user(user).access_token)
+
+            clients = {}
+            for name, middleware in stacks.items():
+                # Middleware chain dimuat saat request pertama, jadi cukup di dalam override_settings
+                with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=['testserver']):
+                    client = Client()
+                    client.cookies['access_token'] = access_token
+                    # Browser yang juga punya session admin tetap mengirim cookie-nya ke /api/
+                    client.cookies['sessionid'] = 'bench-session'
+                    for _ in range(100):
+                        client.get(path)
+                    clients[name] = client
+
+            # Bergantian per putaran supaya noise mesin kena ke kedua stack secara merata
+            timings = {name: [] for name in clients}
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for _ in range(0, iterations, 100):
+                    for name, client in clients.items():
+                        for _ in range(100):
+                            started = time.perf_counter()
+                            client.get(path)
+                            timings[name].append((time.perf_counter() - started) * 1e6)
+
+            results = {name: statistics.median(values) for name, values in timings.items()}
+            for name, median in results.items():
+                self.stdout.write(f"{name}: median {median:.0f} us/request over {len(timings[name])} requests")
+
+            transaction.set_rollback(True)
+
+        saved = results['full'] - results['sessionless']
+        self.stdout.write(self.style.SUCCESS(
+            f"sessionless profile saves {saved:.0f} us/request ({saved / results['full'] * 100:.1f}%) on {path}"
+        ))
@@ -0,0 +1,54 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from authentication.ratelimit import LoginFailureThrottle, LoginThrottle, SlidingWindowLimiter
+
+
+class Command(BaseCommand):
+    help = "Measure the per-check overhead of the sliding-window rate limiter on the configured cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10000, help="Checks per measurement")
+        parser.add_argument('--idents', type=int, default=100, help="Distinct clients to spread checks over")
+
+    def handle(self, *args, **options):
+        iterations = max(options['iterations'], 1)
+        idents = [uuid.uuid4().hex for _ in range(max(options['idents'], 1))]
+        # Limit sangat besar supaya yang diukur hanya biaya pengecekan
+        limiter = SlidingWindowLimiter('bench', limit=10 ** 9, window=60)
+
+        self.report("limiter.hit", iterations, lambda i: limiter.hit(idents[i % len(idents)]))
+        self.report("limiter.is_limited", iterations, lambda i: limiter.is_limited(idents[i % len(idents)]))
+
+        # Throttle login lengkap: hit per IP + cek kegagalan per IP dan akun
+        factory = APIRequestFactory()
+        view = APIView()
+        requests = [
+            view.initialize_request(factory.post(
+                '/api/auth/login', {'username_or_email': ident, 'password': 'x'}, format='json', REMOTE_ADDR=f"10.0.{n // 250}.{n % 250}"
+            ))
+            for n, ident in enumerate(idents)
+        ]
+        throttles = [LoginThrottle(), LoginFailureThrottle()]
+
+        def check(i):
+            request = requests[i % len(requests)]
+            for throttle in throttles:
+                throttle.allow_request(request, view)
+
+        self.report("login throttles", iterations, check)
+        self.stdout.write(f"cache alias: {settings.RATE_LIMITS['CACHE']} ({settings.CACHES[settings.RATE_LIMITS['CACHE']]['BACKEND']})")
+
+    def report(self, label, iterations, func):
+        started = time.perf_counter()
+        for i in range(iterations):
+            func(i)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {elapsed / iterations * 1e6:.1f} us/check over {iterations} checks"
+        ))
@@ -0,0 +1,144 @@
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from authentication.models import CustomUser
+from authentication.serializers import ImportUserSerializer, build_user
+
+
+def _init_worker():
+    # Dengan start method spawn (macOS/Windows) proses anak belum memuat Django
+    if not apps.ready:
+        django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV or NDJSON file (username, email, full_name, password), "
+        "hashing passwords across worker processes and inserting them in batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or NDJSON file, or - for stdin")
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help="Input format (default: from the file extension)")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows validated, hashed and inserted together")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Processes hashing passwords")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Validate and check duplicates without inserting")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or self.detect_format(options['path'])
+        batch_size = max(options['batch_size'], 1)
+        self.dry_run = options['dry_run']
+        self.seen_emails, self.seen_usernames = set(), set()
+        self.imported = self.duplicates = self.invalid = 0
+
+        started = time.monotonic()
+        with self.open_input(options['path']) as stream:
+            rows = self.read_rows(stream, fmt)
+            # Proses anak hanya menjalankan make_password, tidak pernah menyentuh database
+            with ProcessPoolExecutor(max_workers=max(options['workers'], 1), initializer=_init_worker) as executor:
+                self.executor = executor
+                self.chunksize = max(batch_size // (max(options['workers'], 1) * 4), 1)
+                while batch := list(islice(rows, batch_size)):
+                    self.import_batch(batch)
+        elapsed = time.monotonic() - started
+
+        verb = "Would import" if self.dry_run else "Imported"
+        rate = self.imported / elapsed if elapsed > 0 else self.imported
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {self.imported} users, skipped {self.duplicates} duplicates and {self.invalid} invalid rows "
+            f"in {elapsed:.2f}s ({rate:.0f} users/s)"
+        ))
+
+    def detect_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.ndjson', '.jsonl'):
+            return 'ndjson'
+        raise CommandError("Cannot tell the input format from the file name, pass --format")
+
+    def open_input(self, path):
+        if path == '-':
+            return open(sys.stdin.fileno(), encoding='utf-8', closefd=False)
+        try:
+            return open(path, encoding='utf-8', newline='')
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+
+    def read_rows(self, stream, fmt):
+        """Yield ``(line_number, row)``; a row that cannot be parsed is ``None``."""
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+    def import_batch(self, batch):
+        valid = []
+        for line_number, row in batch:
+            if row is None:
+                self.report_invalid(line_number, "not a JSON object")
+                continue
+            serializer = ImportUserSerializer(data=row)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                self.report_invalid(line_number, json.dumps(serializer.errors))
+
+        # Satu query untuk email dan username yang sudah terdaftar di seluruh batch
+        users = [build_user(data, None) for data in valid]
+        if not users:
+            return
+        existing = list(CustomUser.objects.filter(
+            Q(email__in=[user.email for user in users]) | Q(username__in=[user.username for user in users])
+        ).values_list('email', 'username'))
+        taken_emails = {email for email, _ in existing}
+        taken_usernames = {username for _, username in existing}
+
+        new_users, passwords = [], []
+        for user, data in zip(users, valid):
+            if user.email in taken_emails or user.email in self.seen_emails \
+                    or user.username in taken_usernames or user.username in self.seen_usernames:
+                self.duplicates += 1
+                continue
+            self.seen_emails.add(user.email)
+            self.seen_usernames.add(user.username)
+            new_users.append(user)
+            passwords.append(data['password'])
+
+        if self.dry_run:
+            self.imported += len(new_users)
+            return
+
+        for user, encoded in zip(new_users, self.executor.map(make_password, passwords, chunksize=self.chunksize)):
+            user.password = encoded
+        CustomUser.objects.bulk_create(new_users)
+        self.imported += len(new_users)
+
+    def report_invalid(self, line_number, errors):
+        self.invalid += 1
+        self.stderr.write(f"line {line_number}: {errors}")
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted refresh tokens in small primary-key chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=settings.TOKEN_PRUNE_CHUNK_SIZE,
+                            help="Primary-key range deleted per statement")
+        parser.add_argument('--sleep', type=float, default=0,
+                            help="Seconds to pause between chunks")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the rows that would be deleted")
+
+    def handle(self, *args, **options):
+        self.chunk_size = max(options['chunk_size'], 1)
+        self.sleep = options['sleep']
+        self.dry_run = options['dry_run']
+
+        cutoff = now()
+        started = time.monotonic()
+        # Blacklist dulu, supaya cascade dari OutstandingToken tidak perlu menghapusnya satu per satu
+        blacklisted = self.prune(BlacklistedToken.objects.filter(token__expires_at__lt=cutoff))
+        outstanding = self.prune(OutstandingToken.objects.filter(expires_at__lt=cutoff))
+        elapsed = time.monotonic() - started
+
+        total = blacklisted + outstanding
+        verb = "Would delete" if self.dry_run else "Deleted"
+        rate = total / elapsed if elapsed > 0 else total
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {total} expired tokens ({outstanding} outstanding, {blacklisted} blacklisted) "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        ))
+
+    def prune(self, expired):
+        if self.dry_run:
+            return expired.count()
+
+        bounds = expired.aggregate(lower=Min('id'), upper=Max('id'))
+        if bounds['upper'] is None:
+            return 0
+
+        removed = 0
+        lower = bounds['lower']
+        while lower <= bounds['upper']:
+            deleted, _ = expired.filter(id__gte=lower, id__lt=lower + self.chunk_size).delete()
+            removed += deleted
+            lower += self.chunk_size
+            self.pause()
+        return removed
+
+    def pause(self):
+        if self.sleep:
+            time.sleep(self.sleep)
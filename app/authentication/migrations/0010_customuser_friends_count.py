@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2025-05-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_merge_20250427_1948'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='friends_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2025-05-28 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0011_customuser_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['date_joined', 'id'], name='customuser_date_joined_idx'),
+        ),
+    ]
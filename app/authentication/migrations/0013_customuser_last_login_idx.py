@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2025-05-29 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0012_customuser_date_joined_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_login', 'id'], name='customuser_last_login_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2025-05-30 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0013_customuser_last_login_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='last_seen',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Mulai dari last_login supaya user lama tidak langsung terlihat tidak aktif
+        migrations.RunSQL(
+            "UPDATE authentication_customuser SET last_seen = last_login WHERE last_login IS NOT NULL",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_seen', 'id'], name='customuser_last_seen_idx'),
+        ),
+    ]
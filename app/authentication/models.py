@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Lower
     
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
@@ -12,10 +14,27 @@ class CustomUser(AbstractUser):
     
     hex_color = models.CharField(max_length=128, blank=True, null=True)
     saldo = models.IntegerField(default=0)
+    # Dipelihara oleh user.services (link_friends/unlink_friends); perbaiki dengan `manage.py repair_friends_count`
+    friends_count = models.PositiveIntegerField(default=0)
+    # Aktivitas terakhir lewat JWT, ditulis berkala oleh authentication.activity (bukan per request)
+    last_seen = models.DateTimeField(blank=True, null=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'full_name']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Pencarian user: prefix/fuzzy lewat pg_trgm, email lewat equality
+            GinIndex(OpClass(Lower('username'), name='gin_trgm_ops'), name='customuser_username_trgm'),
+            GinIndex(OpClass(Lower('full_name'), name='gin_trgm_ops'), name='customuser_full_name_trgm'),
+            models.Index(Lower('email'), name='customuser_email_lower_idx'),
+            # Keyset pagination daftar user admin (urutan default -date_joined, -id)
+            models.Index(fields=['date_joined', 'id'], name='customuser_date_joined_idx'),
+            models.Index(fields=['last_login', 'id'], name='customuser_last_login_idx'),
+            # Hitungan dan daftar aktif/tidak aktif di admin
+            models.Index(fields=['last_seen', 'id'], name='customuser_last_seen_idx'),
+        ]
+
     def set_hex_color(self, color):
         self.hex_color = make_password(color)
 
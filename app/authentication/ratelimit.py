@@ -0,0 +1,141 @@
+"""
+Sliding-window rate limits on top of the Django cache.
+
+Each limit keeps one counter per fixed window, created with ``cache.add`` and bumped
+with ``cache.incr``, both atomic on Redis/Memcached (and under a lock on LocMemCache).
+The sliding count weights the previous window by how much of it still overlaps
+``window`` seconds back from now, so a burst at a window edge cannot double the limit.
+
+Limits only hold across workers when ``settings.RATE_LIMITS["CACHE"]`` points to a
+shared cache (set ``REDIS_URL``); the default LocMemCache is per process.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+class SlidingWindowLimiter:
+    def __init__(self, scope, limit, window, cache_alias=None):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.cache = caches[cache_alias or settings.RATE_LIMITS["CACHE"]]
+
+    def _keys(self, ident, now):
+        ident = hashlib.sha1(str(ident).encode()).hexdigest()
+        index = int(now // self.window)
+        return f"rl:{self.scope}:{ident}:{index}", f"rl:{self.scope}:{ident}:{index - 1}"
+
+    def _estimate(self, current, previous, now):
+        overlap = 1 - (now % self.window) / self.window
+        return previous * overlap + current
+
+    def hit(self, ident):
+        """Count one event for ``ident``; returns False when it goes over the limit."""
+        now = time.time()
+        current_key, previous_key = self._keys(ident, now)
+        self.cache.add(current_key, 0, self.window * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Key keluar dari cache di antara add dan incr
+            self.cache.set(current_key, 1, self.window * 2)
+            current = 1
+        previous = self.cache.get(previous_key, 0)
+        return self._estimate(current, previous, now) <= self.limit
+
+    def refund(self, ident):
+        """Take back one ``hit`` that should not count after all."""
+        current_key, _ = self._keys(ident, time.time())
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            # Window sudah berganti; sisa hitungan ikut kedaluwarsa bersama window lama
+            pass
+
+    def is_limited(self, ident):
+        """True once ``ident`` already used up the limit, without counting anything."""
+        now = time.time()
+        current_key, previous_key = self._keys(ident, now)
+        counts = self.cache.get_many([current_key, previous_key])
+        return self._estimate(counts.get(current_key, 0), counts.get(previous_key, 0), now) >= self.limit
+
+    def reset(self, ident):
+        self.cache.delete_many(self._keys(ident, time.time()))
+
+
+def get_limiter(scope):
+    limit, window = settings.RATE_LIMITS["RATES"][scope]
+    return SlidingWindowLimiter(scope, limit, window)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Counts every request against ``scope`` per client IP. Usable on any view through
+    ``throttle_classes``; subclasses set ``scope`` to a key of ``RATE_LIMITS["RATES"]``.
+    """
+    scope = None
+
+    def allow_request(self, request, view):
+        limiter = get_limiter(self.scope)
+        self.window = limiter.window
+        return limiter.hit(self.get_ident(request))
+
+    def wait(self):
+        return self.window
+
+
+class FailureThrottle(BaseThrottle):
+    """
+    Rejects a client once too many failures were counted for its IP or for the
+    account it posts (``account_field``). Every attempt is counted up front with an
+    atomic ``hit``, so parallel requests cannot all pass the check before the first
+    failure lands; a rejected attempt is refunded, and the view calls ``reset`` after
+    a successful one. A locked-out request never reaches password hashing.
+    """
+    scope = None
+    account_field = 'username_or_email'
+
+    def targets(self, request):
+        account = str(request.data.get(self.account_field, '')).strip().lower()
+        return [
+            (get_limiter(f"{self.scope}_ip"), self.get_ident(request)),
+            (get_limiter(f"{self.scope}_account"), account),
+        ]
+
+    def allow_request(self, request, view):
+        targets = self.targets(request)
+        self.window = max(limiter.window for limiter, _ in targets)
+        allowed = [limiter.hit(ident) for limiter, ident in targets]
+        if all(allowed):
+            return True
+        # Percobaan yang ditolak tidak ikut memperpanjang lockout
+        for limiter, ident in targets:
+            limiter.refund(ident)
+        return False
+
+    def wait(self):
+        return self.window
+
+    @classmethod
+    def reset(cls, request):
+        # Percobaan yang berhasil bukan kegagalan: hapus counter akun dan kembalikan hitungan IP.
+        # Counter IP tetap berlaku untuk akun lain dari IP yang sama
+        (ip_limiter, ip), (account_limiter, account) = cls().targets(request)
+        ip_limiter.refund(ip)
+        account_limiter.reset(account)
+
+
+class LoginThrottle(SlidingWindowThrottle):
+    scope = 'login'
+
+
+class LoginFailureThrottle(FailureThrottle):
+    scope = 'login_failures'
+
+
+class ForgotPasswordFailureThrottle(FailureThrottle):
+    scope = 'forgot_password_failures'
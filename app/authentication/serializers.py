@@ -1,8 +1,8 @@
 from html import escape
 from zoneinfo import ZoneInfo
 
+from django.db.models import Q
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from authentication.models import CustomUser
 
@@ -13,6 +13,22 @@ def validate_username(value):
     return value
 
 
+def escape_profile_fields(attrs):
+    attrs['email'] = escape(attrs.get('email', ''))
+    attrs['full_name'] = escape(attrs.get('full_name', ''))
+    return attrs
+
+def build_user(validated_data, encoded_password):
+    """Unsaved user as ``create_user`` would build it, with a password hashed elsewhere."""
+    user = CustomUser(
+        username=CustomUser.normalize_username(validated_data['username']),
+        email=CustomUser.objects.normalize_email(validated_data['email']),
+        full_name=validated_data['full_name'],
+    )
+    user.password = encoded_password
+    return user
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     username = serializers.CharField(validators=[validate_username])
     password2 = serializers.CharField(write_only=True)
@@ -25,32 +41,46 @@ class RegisterSerializer(serializers.ModelSerializer):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({'password': 'Passwords do not match'})
         
-        attrs['email'] = escape(attrs.get('email', ''))
-        attrs['full_name'] = escape(attrs.get('full_name', ''))
-        
-        return attrs
+        return escape_profile_fields(attrs)
     
     def create(self, validated_data):
         validated_data.pop('password2')
-        user = CustomUser.objects.create_user(**validated_data)
+        encoded_password = validated_data.pop('encoded_password', None)
+        if encoded_password is None:
+            return CustomUser.objects.create_user(**validated_data)
+
+        # Password sudah di-hash di hashing pool (RegisterView)
+        user = build_user(validated_data, encoded_password)
+        user.save()
         return user
 
+class ImportUserSerializer(RegisterSerializer):
+    # Satu baris file `manage.py import_users`: tanpa password2, dan keunikan email/username
+    # dicek command itu per batch dengan satu query, bukan satu query per baris
+    password2 = None
+
+    class Meta(RegisterSerializer.Meta):
+        fields = ['username', 'email', 'full_name', 'password']
+        extra_kwargs = {'email': {'validators': []}}
+
+    def validate(self, attrs):
+        return escape_profile_fields(attrs)
+
 class LoginSerializer(serializers.Serializer):
     username_or_email = serializers.CharField()
     password = serializers.CharField(write_only=True)
     
     def validate(self, attrs):
         username_or_email = escape(attrs.get('username_or_email'))
-        password = attrs.get('password')
         
-        user = CustomUser.objects.filter(username=username_or_email).first() or \
-               CustomUser.objects.filter(email=username_or_email).first()
+        # Satu query untuk username atau email; kalau dua-duanya cocok, username didahulukan
+        candidates = list(CustomUser.objects.filter(Q(username=username_or_email) | Q(email=username_or_email))[:2])
+        user = next((u for u in candidates if u.username == username_or_email), None) or \
+               next(iter(candidates), None)
         
-        if user and user.check_password(password):
-            refresh = RefreshToken.for_user(user)
-            attrs['user_id'] = user.id
-            attrs['refresh'] = str(refresh)
-            attrs['access'] = str(refresh.access_token)
+        if user:
+            # Password dicek LoginView di hashing pool, token juga dibuat di sana
+            attrs['user'] = user
             return attrs
         
         raise serializers.ValidationError('Invalid credentials')
@@ -69,16 +99,16 @@ class VerifyColorSerializer(serializers.Serializer):
         if not user:
             raise serializers.ValidationError({"message": "User not found"})
 
-        if not user.check_hex_color(hex_color):
-            raise serializers.ValidationError({"message": "Invalid hex color"})
-
+        # Hex color dicek ForgotPasswordView di hashing pool
         data["user"] = user
+        data["hex_color"] = hex_color
         return data
     
 class UserSerializer(serializers.ModelSerializer):
     date_joined = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
     last_login = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', allow_null=True)
+    last_seen = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', allow_null=True)
 
     class Meta:
         model = CustomUser
-        fields = ['id', 'avatar_id', 'username', 'email', 'full_name', 'date_joined', 'last_login']
\ No newline at end of file
+        fields = ['id', 'avatar_id', 'username', 'email', 'full_name', 'date_joined', 'last_login', 'last_seen']
\ No newline at end of file
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.auth import invalidate_cached_users
+from authentication.models import CustomUser
+from authentication.tokens import claims_version, set_claims_version
+
+# Setiap save()/delete() user membuang baris yang di-cache CookieJWTAuthentication.
+# Update massal (queryset.update) harus memanggil invalidate_cached_users sendiri.
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_on_save(sender, instance, **kwargs):
+    invalidate_cached_users([instance.pk])
+    # Token dengan cv lama akan jatuh ke lookup database dan diterbitkan ulang
+    set_claims_version(instance.pk, claims_version(instance))
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_on_delete(sender, instance, **kwargs):
+    invalidate_cached_users([instance.pk])
+    set_claims_version(instance.pk, '')
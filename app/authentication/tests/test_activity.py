@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APITestCase
+
+from authentication.activity import LastSeenTracker, last_seen_tracker
+from authentication.models import CustomUser
+
+
+class LastSeenTrackerTests(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(username=f'seen{i}', email=f'seen{i}@example.com', password='Pass123!')
+            for i in range(3)
+        ]
+
+    def test_touches_are_coalesced_into_one_update(self):
+        tracker = LastSeenTracker(interval=60)
+        for _ in range(5):
+            for user in self.users:
+                tracker.touch(user.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(tracker.flush(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(tracker.flush(), 0)
+        self.assertEqual(CustomUser.objects.filter(last_seen__isnull=False).count(), 3)
+
+    def test_flush_waits_for_interval_and_no_open_transaction(self):
+        tracker = LastSeenTracker(interval=0)
+        # Test berjalan di dalam transaksi, jadi flush ditunda
+        with self.assertNumQueries(0):
+            tracker.touch(self.users[0].id)
+
+        with patch.object(connection, 'in_atomic_block', False), self.assertNumQueries(1):
+            tracker.touch(self.users[1].id)
+        self.assertEqual(CustomUser.objects.filter(last_seen__isnull=False).count(), 2)
+
+        tracker.interval = 60
+        with patch.object(connection, 'in_atomic_block', False), self.assertNumQueries(0):
+            tracker.touch(self.users[2].id)
+
+    def test_flush_never_moves_last_seen_backwards(self):
+        later = now() + timedelta(minutes=5)
+        CustomUser.objects.filter(id=self.users[0].id).update(last_seen=later)
+        tracker = LastSeenTracker(interval=60)
+        tracker.touch(self.users[0].id)
+        tracker.flush()
+        self.users[0].refresh_from_db()
+        self.assertEqual(self.users[0].last_seen, later)
+
+
+class AuthenticationTouchTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='visitor', email='visitor@example.com', password='Pass123!')
+        self.client.post(reverse('authentication:login'), {'username_or_email': 'visitor', 'password': 'Pass123!'})
+        last_seen_tracker.flush()
+        CustomUser.objects.filter(id=self.user.id).update(last_seen=None)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_authenticated_request_records_last_seen(self):
+        self.client.get(reverse('authentication:user_info'))
+        self.assertEqual(last_seen_tracker.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
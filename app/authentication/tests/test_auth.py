@@ -0,0 +1,191 @@
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.auth import CookieJWTAuthentication, UserCache, user_cache
+from authentication.models import CustomUser
+from authentication.tokens import CLAIMS_VERSION_CLAIM
+from user_dashboard.services import apply_transaction
+
+
+@override_settings(
+    AUTH_USER_CACHE={**settings.AUTH_USER_CACHE, 'ENABLED': True},
+    AUTH_CLAIMS_VERSION={**settings.AUTH_CLAIMS_VERSION, 'ENABLED': True},
+)
+class UserCacheTests(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = CustomUser.objects.create_user(username='cached', email='cached@example.com', password='Pass123!')
+        self.token = AccessToken.for_user(self.user)
+        self.client.cookies['access_token'] = str(self.token)
+        self.user_info_url = reverse('authentication:user_info')
+
+    def tearDown(self):
+        user_cache.clear()
+        cache.clear()
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.user_info_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q for q in queries.captured_queries if 'authentication_customuser' in q['sql']]
+
+    def test_second_request_is_served_from_cache(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_save_invalidates_cached_user(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.user_info_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_delete_invalidates_cached_user(self):
+        self.user_queries()
+        self.user.delete()
+
+        response = self.client.get(self.user_info_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_update_invalidates_cached_user(self):
+        authenticator = CookieJWTAuthentication()
+        self.assertEqual(authenticator.get_user(self.token).saldo, 0)
+
+        apply_transaction(self.user.id, 'income', Decimal('250.00'), date(2025, 5, 1))
+        self.assertEqual(authenticator.get_user(self.token).saldo, 250)
+
+    def test_returns_copies(self):
+        authenticator = CookieJWTAuthentication()
+        authenticator.get_user(self.token).username = 'changed'
+        self.assertEqual(authenticator.get_user(self.token).username, 'cached')
+
+    def test_disabled_without_shared_cache(self):
+        authenticator = CookieJWTAuthentication()
+        with override_settings(AUTH_USER_CACHE={**settings.AUTH_USER_CACHE, 'ENABLED': False}):
+            authenticator.get_user(self.token)
+            with self.assertNumQueries(1):
+                authenticator.get_user(self.token)
+
+    def test_lru_is_bounded(self):
+        lru = UserCache(max_size=2, ttl=60)
+        lru.set('1', 0, 'a')
+        lru.set('2', 0, 'b')
+        lru.get('1', 0)
+        lru.set('3', 0, 'c')
+
+        self.assertIsNone(lru.get('2', 0))
+        self.assertEqual(lru.get('1', 0), 'a')
+        self.assertIsNone(lru.get('1', 'stale'))
+
+
+@override_settings(AUTH_CLAIMS_VERSION={**settings.AUTH_CLAIMS_VERSION, 'ENABLED': True})
+class TokenClaimsTests(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='claims', email='claims@example.com', password='Pass123!', avatar_id=3
+        )
+        self.user_info_url = reverse('authentication:user_info')
+        response = self.client.post(
+            reverse('authentication:login'), {'username_or_email': 'claims', 'password': 'Pass123!'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def tearDown(self):
+        user_cache.clear()
+        cache.clear()
+
+    def test_login_token_carries_claims(self):
+        token = AccessToken(self.client.cookies['access_token'].value)
+        self.assertEqual(token['username'], 'claims')
+        self.assertEqual(token['avatar_id'], 3)
+        self.assertFalse(token['is_staff'])
+        self.assertIn(CLAIMS_VERSION_CLAIM, token)
+
+    def test_user_info_is_served_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.user_info_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['username'], 'claims')
+        self.assertEqual(response.data['data']['avatar_id'], 3)
+        self.assertNotIn('access_token', response.cookies)
+
+    def test_stale_claims_fall_back_and_reissue_token(self):
+        old_token = AccessToken(self.client.cookies['access_token'].value)
+        self.user.avatar_id = 7
+        self.user.save()
+
+        response = self.client.get(self.user_info_url)
+        self.assertEqual(response.data['data']['avatar_id'], 7)
+        new_token = AccessToken(response.cookies['access_token'].value)
+        self.assertEqual(new_token['avatar_id'], 7)
+        self.assertEqual(new_token['exp'], old_token['exp'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.user_info_url)
+        self.assertEqual(response.data['data']['avatar_id'], 7)
+
+    def test_refresh_rebuilds_claims_from_database(self):
+        CustomUser.objects.filter(id=self.user.id).update(is_staff=True)
+
+        response = self.client.post(reverse('authentication:token_refresh'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(response.cookies['access_token'].value)['is_staff'])
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.user_info_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_CLAIMS_VERSION={**settings.AUTH_CLAIMS_VERSION, 'ENABLED': False})
+    def test_version_read_from_database_without_shared_cache(self):
+        self.client.get(self.user_info_url)
+        # Dinonaktifkan oleh worker lain: versi di cache proses ini tidak pernah diperbarui
+        CustomUser.objects.filter(id=self.user.id).update(is_active=False)
+
+        response = self.client.get(self.user_info_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LoginPipelineTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='pipeline', email='pipeline@example.com', password='Pass123!')
+        self.login_url = reverse('authentication:login')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_login_by_email_uses_single_lookup_and_mint(self):
+        # lookup user, insert OutstandingToken, update last_login
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                self.login_url, {'username_or_email': 'pipeline@example.com', 'password': 'Pass123!'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+        self.assertNotIn('sessionid', response.cookies)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_username_match_wins_over_email_match(self):
+        CustomUser.objects.create_user(username='pipeline@example.com', email='other@example.com', password='Other123!')
+        response = self.client.post(
+            self.login_url, {'username_or_email': 'pipeline@example.com', 'password': 'Other123!'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['username'], 'pipeline@example.com')
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from authentication.blacklist import BloomFilter, blacklist_filter
+from authentication.models import CustomUser
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.001)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 50)
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER={**settings.TOKEN_BLACKLIST_FILTER, 'ENABLED': True})
+class RefreshBlacklistTests(APITestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(username='refresher', email='refresher@example.com', password='Pass123!')
+        self.client.post(reverse('authentication:login'), {'username_or_email': 'refresher', 'password': 'Pass123!'})
+        blacklist_filter.rebuild()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_refresh_skips_blacklist_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('authentication:token_refresh'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries if 'token_blacklist_blacklistedtoken' in query['sql']])
+
+    def test_refresh_after_logout_is_rejected(self):
+        refresh_token = self.client.cookies['refresh_token'].value
+        self.assertEqual(self.client.post(reverse('authentication:logout')).status_code, status.HTTP_200_OK)
+
+        self.client.cookies['refresh_token'] = refresh_token
+        response = self.client.post(reverse('authentication:token_refresh'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuilt_filter_still_rejects_logged_out_token(self):
+        refresh_token = self.client.cookies['refresh_token'].value
+        self.client.post(reverse('authentication:logout'))
+        blacklist_filter.rebuild()
+
+        self.client.cookies['refresh_token'] = refresh_token
+        response = self.client.post(reverse('authentication:token_refresh'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TOKEN_BLACKLIST_FILTER={**settings.TOKEN_BLACKLIST_FILTER, 'ENABLED': False})
+    def test_without_shared_cache_checks_database(self):
+        # Logout di proses lain: baris blacklist ada, tapi filter proses ini tidak pernah diberi tahu
+        refresh_token = self.client.cookies['refresh_token'].value
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get())
+
+        self.client.cookies['refresh_token'] = refresh_token
+        response = self.client.post(reverse('authentication:token_refresh'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PruneTokensTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='pruner', email='pruner@example.com', password='Pass123!')
+
+    def create_tokens(self, count, expires_in, blacklisted=False):
+        tokens = OutstandingToken.objects.bulk_create([
+            OutstandingToken(user=self.user, jti=f"{expires_in.days}-{blacklisted}-{i}", token="token",
+                             expires_at=now() + expires_in)
+            for i in range(count)
+        ])
+        if blacklisted:
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens])
+        return tokens
+
+    def prune(self, *args):
+        out = StringIO()
+        call_command('prune_tokens', *args, stdout=out)
+        return out.getvalue()
+
+    def test_prune_removes_only_expired_tokens(self):
+        self.create_tokens(5, timedelta(days=-2))
+        self.create_tokens(3, timedelta(days=-1), blacklisted=True)
+        live = self.create_tokens(2, timedelta(days=1))
+        live_blacklisted = self.create_tokens(2, timedelta(days=2), blacklisted=True)
+
+        output = self.prune('--chunk-size', '2')
+
+        self.assertIn("Deleted 11 expired tokens (8 outstanding, 3 blacklisted)", output)
+        self.assertEqual(
+            set(OutstandingToken.objects.values_list('id', flat=True)),
+            {token.id for token in live + live_blacklisted},
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    def test_dry_run_deletes_nothing(self):
+        self.create_tokens(4, timedelta(days=-1), blacklisted=True)
+
+        output = self.prune('--dry-run')
+
+        self.assertIn("Would delete 8 expired tokens (4 outstanding, 4 blacklisted)", output)
+        self.assertEqual(OutstandingToken.objects.count(), 4)
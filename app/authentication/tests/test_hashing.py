@@ -0,0 +1,105 @@
+import threading
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db.models import F
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.hashing import HashingPool, HashingPoolBusy, amake_password
+from authentication.models import CustomUser
+
+
+class HashingPoolTests(SimpleTestCase):
+    def test_rejects_beyond_queue_depth(self):
+        pool = HashingPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+        running = pool.submit(release.wait)
+        queued = pool.submit(release.wait)
+
+        with self.assertRaises(HashingPoolBusy):
+            pool.submit(release.wait)
+
+        release.set()
+        running.result(timeout=5)
+        queued.result(timeout=5)
+        self.assertTrue(pool.submit(lambda: True).result(timeout=5))
+
+
+class AsyncAuthViewTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='hasher', email='hasher@example.com', password='Pass123!')
+        self.user.set_hex_color('#123456')
+        self.user.save()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_saturated_pool_returns_503(self):
+        pool = HashingPool(max_workers=1, max_queue=0, retry_after=2)
+        release = threading.Event()
+        pool.submit(release.wait)
+        try:
+            with patch('authentication.hashing.get_hashing_pool', return_value=pool):
+                response = self.client.post(
+                    reverse('authentication:login'), {'username_or_email': 'hasher', 'password': 'Pass123!'}
+                )
+        finally:
+            release.set()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_register_stores_usable_hash(self):
+        response = self.client.post(reverse('authentication:register'), {
+            'username': 'Newcomer', 'email': 'newcomer@EXAMPLE.com', 'full_name': 'New Comer',
+            'password': 'Pass123!', 'password2': 'Pass123!',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        user = CustomUser.objects.get(username='Newcomer')
+        self.assertEqual(user.email, 'newcomer@example.com')
+        self.assertTrue(user.check_password('Pass123!'))
+
+    def test_forgot_password_checks_hex_color(self):
+        url = reverse('authentication:forgot_password')
+        response = self.client.post(url, {'username_or_email': 'hasher', 'hex_color': '#000000', 'new_password': 'New123!'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['data'], {'message': ['Invalid hex color']})
+
+        response = self.client.post(url, {'username_or_email': 'hasher', 'hex_color': '#123456', 'new_password': 'New123!'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('New123!'))
+
+    def test_forgot_password_keeps_concurrent_updates(self):
+        async def make_password_during_update(raw):
+            # Transfer dan accept teman selesai selagi password baru di-hash
+            await sync_to_async(CustomUser.objects.filter(id=self.user.id).update)(
+                saldo=F('saldo') + 500, friends_count=F('friends_count') + 1
+            )
+            return await amake_password(raw)
+
+        with patch('authentication.views.amake_password', make_password_during_update):
+            response = self.client.post(reverse('authentication:forgot_password'), {
+                'username_or_email': 'hasher', 'hex_color': '#123456', 'new_password': 'New123!'
+            })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.saldo, self.user.friends_count), (500, 1))
+        self.assertTrue(self.user.check_password('New123!'))
+
+    def test_login_upgrades_outdated_hash(self):
+        with override_settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher',
+        ]):
+            CustomUser.objects.filter(id=self.user.id).update(password=make_password('Pass123!', hasher='md5'))
+            response = self.client.post(
+                reverse('authentication:login'), {'username_or_email': 'hasher', 'password': 'Pass123!'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from authentication.models import CustomUser
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(username='existing', email='existing@example.com', password='Pass123!')
+
+    def write_file(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def import_users(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_users', path, '--workers', '2', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_validates_and_skips_duplicates(self):
+        path = self.write_file('.csv', (
+            "username,email,full_name,password\n"
+            "alice,alice@Example.com,Alice,Pass123!\n"
+            "pawcat_fan,fan@example.com,Fan,Pass123!\n"
+            "someone,existing@example.com,Someone,Pass123!\n"
+            "alice,alice2@example.com,Alice Again,Pass123!\n"
+            "bob,bob@example.com,Bob,Pass123!\n"
+        ))
+
+        out, err = self.import_users(path, '--batch-size', '2')
+
+        self.assertIn("Imported 2 users, skipped 2 duplicates and 1 invalid rows", out)
+        self.assertIn("line 3: ", err)
+        alice = CustomUser.objects.get(username='alice')
+        self.assertEqual(alice.email, 'alice@example.com')
+        self.assertTrue(alice.check_password('Pass123!'))
+        self.assertTrue(CustomUser.objects.filter(username='bob').exists())
+        self.assertFalse(CustomUser.objects.filter(username='pawcat_fan').exists())
+
+    def test_ndjson_runs_one_lookup_and_one_insert_per_batch(self):
+        rows = [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'full_name': f'User {i}', 'password': 'Pass123!'}
+            for i in range(6)
+        ]
+        path = self.write_file('.ndjson', "\n".join(json.dumps(row) for row in rows) + "\nnot json\n")
+
+        with self.assertNumQueries(4):
+            out, err = self.import_users(path, '--batch-size', '4')
+
+        self.assertIn("Imported 6 users, skipped 0 duplicates and 1 invalid rows", out)
+        self.assertIn("line 7: not a JSON object", err)
+        self.assertEqual(CustomUser.objects.filter(username__startswith='user').count(), 6)
+
+    def test_dry_run_inserts_nothing(self):
+        path = self.write_file('.csv', "username,email,full_name,password\ncarol,carol@example.com,Carol,Pass123!\n")
+
+        out, _ = self.import_users(path, '--dry-run')
+
+        self.assertIn("Would import 1 users", out)
+        self.assertFalse(CustomUser.objects.filter(username='carol').exists())
@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from authentication.models import CustomUser
+from authentication.ratelimit import LoginFailureThrottle, SlidingWindowLimiter
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def test_hit_allows_up_to_limit(self):
+        limiter = SlidingWindowLimiter('test', limit=3, window=60)
+        with patch('authentication.ratelimit.time.time', return_value=600.0):
+            self.assertEqual([limiter.hit('client') for _ in range(4)], [True, True, True, False])
+            self.assertTrue(limiter.hit('other'))
+            self.assertTrue(limiter.is_limited('client'))
+
+    def test_previous_window_is_weighted(self):
+        limiter = SlidingWindowLimiter('test', limit=4, window=60)
+        with patch('authentication.ratelimit.time.time', return_value=650.0):
+            for _ in range(4):
+                limiter.hit('client')
+
+        # 15 detik ke window berikutnya: 4 * 0.75 = 3 masih terhitung
+        with patch('authentication.ratelimit.time.time', return_value=675.0):
+            self.assertTrue(limiter.hit('client'))
+            self.assertFalse(limiter.hit('client'))
+
+        # Window sebelumnya sudah lewat seluruhnya
+        with patch('authentication.ratelimit.time.time', return_value=800.0):
+            self.assertFalse(limiter.is_limited('client'))
+
+    def test_refund(self):
+        limiter = SlidingWindowLimiter('test', limit=1, window=60)
+        limiter.hit('client')
+        limiter.refund('client')
+        self.assertFalse(limiter.is_limited('client'))
+        limiter.refund('unknown')
+
+    def test_reset(self):
+        limiter = SlidingWindowLimiter('test', limit=1, window=60)
+        limiter.hit('client')
+        self.assertTrue(limiter.is_limited('client'))
+        limiter.reset('client')
+        self.assertFalse(limiter.is_limited('client'))
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        self.login_url = reverse('authentication:login')
+        CustomUser.objects.create_user(username='victim', email='victim@example.com', password='Pass123!')
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, username, password='wrong', ip='10.0.0.1'):
+        return self.client.post(
+            self.login_url, {'username_or_email': username, 'password': password}, REMOTE_ADDR=ip
+        )
+
+    def test_locked_account_skips_password_check(self):
+        for _ in range(3):
+            self.login('victim')
+
+        with patch('authentication.views.LoginSerializer.validate') as validate:
+            response = self.login('victim', password='Pass123!', ip='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        validate.assert_not_called()
+
+    def test_account_key_is_case_insensitive(self):
+        for name in ('victim', 'VICTIM', 'Victim'):
+            self.login(name, ip=f'10.0.1.{len(name)}')
+        self.assertEqual(self.login('victim', ip='10.0.2.1').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(RATE_LIMITS={'CACHE': 'default', 'RATES': {
+        'login': (30, 60), 'login_failures_ip': (2, 300), 'login_failures_account': (3, 300),
+    }})
+    def test_ip_is_limited_across_accounts(self):
+        self.login('first')
+        self.login('second')
+        self.assertEqual(self.login('third').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login('third', ip='10.0.0.9').status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RATE_LIMITS={'CACHE': 'default', 'RATES': {
+        'login': (30, 60), 'login_failures_ip': (2, 300), 'login_failures_account': (3, 300),
+    }})
+    def test_rotating_forwarded_for_does_not_reset_ip_limit(self):
+        for i, name in enumerate(('first', 'second', 'third')):
+            response = self.client.post(
+                self.login_url, {'username_or_email': name, 'password': 'wrong'},
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}'
+            )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_success_resets_account_failures(self):
+        for _ in range(2):
+            self.login('victim')
+        self.assertEqual(self.login('victim', password='Pass123!').status_code, status.HTTP_200_OK)
+        for _ in range(2):
+            self.assertEqual(self.login('victim').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_in_flight_attempts_count_against_account(self):
+        # Request paralel yang masih hashing password sudah memakai kuota, sebelum ada yang gagal
+        def attempt(ip):
+            request = APIRequestFactory().post(
+                self.login_url, {'username_or_email': 'victim', 'password': 'wrong'}, format='json', REMOTE_ADDR=ip
+            )
+            return LoginFailureThrottle().allow_request(Request(request, parsers=[JSONParser()]), None)
+
+        self.assertEqual([attempt(f'10.0.3.{i}') for i in range(4)], [True, True, True, False])
+        self.assertEqual(self.login('victim', password='Pass123!', ip='10.0.3.9').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import CustomUser
+from config.middleware import NonApiAuthenticationMiddleware, NonApiSessionMiddleware
+
+SESSIONLESS_MIDDLEWARE = [
+    settings.SESSIONLESS_MIDDLEWARE_REPLACEMENTS.get(middleware, middleware) for middleware in settings.MIDDLEWARE
+]
+
+
+class PathScopedMiddlewareTests(SimpleTestCase):
+    def run_middleware(self, path):
+        seen = {}
+
+        def view(request):
+            seen['session'] = hasattr(request, 'session')
+            seen['user'] = hasattr(request, 'user')
+            return HttpResponse()
+
+        middleware = NonApiSessionMiddleware(NonApiAuthenticationMiddleware(view))
+        middleware(RequestFactory().get(path))
+        return seen
+
+    def test_api_paths_skip_wrapped_middleware(self):
+        self.assertEqual(self.run_middleware('/api/auth/user-info'), {'session': False, 'user': False})
+
+    def test_other_paths_run_wrapped_middleware(self):
+        self.assertEqual(self.run_middleware('/admin/'), {'session': True, 'user': True})
+
+
+@override_settings(
+    MIDDLEWARE=SESSIONLESS_MIDDLEWARE,
+    AUTH_CLAIMS_VERSION={**settings.AUTH_CLAIMS_VERSION, 'ENABLED': True},
+)
+class SessionlessProfileTests(APITestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(username='nosession', email='nosession@example.com', password='Pass123!')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_api_requests_do_not_touch_sessions(self):
+        response = self.client.post(
+            reverse('authentication:login'), {'username_or_email': 'nosession', 'password': 'Pass123!'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertNotIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+        self.client.cookies['sessionid'] = 'stale-admin-session'
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('authentication:user_info'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_admin_keeps_full_middleware(self):
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+
+@override_settings(JWT_CSRF_CHECK=True)
+class DoubleSubmitCsrfTests(APITestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(username='csrf', email='csrf@example.com', password='Pass123!')
+        response = self.client.post(
+            reverse('authentication:login'), {'username_or_email': 'csrf', 'password': 'Pass123!'}
+        )
+        self.csrf_token = response.data['data']['csrf_token']
+        self.logout_url = reverse('authentication:logout')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_login_sets_matching_cookie(self):
+        self.assertEqual(self.client.cookies[settings.JWT_CSRF_COOKIE_NAME].value, self.csrf_token)
+
+    def test_unsafe_request_without_header_is_rejected(self):
+        response = self.client.post(self.logout_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unsafe_request_with_wrong_header_is_rejected(self):
+        response = self.client.post(self.logout_url, HTTP_X_CSRF_TOKEN='forged')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_matching_header_passes(self):
+        response = self.client.post(self.logout_url, HTTP_X_CSRF_TOKEN=self.csrf_token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_safe_methods_need_no_header(self):
+        response = self.client.get(reverse('authentication:user_info'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
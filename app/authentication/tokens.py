@@ -0,0 +1,79 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from authentication.blacklist import blacklist_filter
+from authentication.models import CustomUser
+
+# Klaim user yang ikut di access token, cukup untuk UserInfoView dan cek is_staff
+USER_CLAIMS = ('username', 'avatar_id', 'is_staff', 'is_superuser', 'is_active')
+CLAIMS_VERSION_CLAIM = 'cv'
+
+
+def claims_version(user):
+    """Fingerprint of the user's claim values; a token whose ``cv`` differs carries stale claims."""
+    raw = '|'.join(str(getattr(user, claim)) for claim in USER_CLAIMS)
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+def _claims_version_key(user_id):
+    return f"auth_claims_version:{user_id}"
+
+def _load_claims_version(user_id):
+    user = CustomUser.objects.filter(id=user_id).only(*USER_CLAIMS).first()
+    return claims_version(user) if user else ''
+
+def get_claims_version(user_id):
+    options = settings.AUTH_CLAIMS_VERSION
+    # Tanpa cache bersama, set_claims_version di worker lain tidak terlihat di sini
+    if not options["ENABLED"]:
+        return _load_claims_version(user_id)
+    version = cache.get(_claims_version_key(user_id))
+    if version is None:
+        version = _load_claims_version(user_id)
+        cache.set(_claims_version_key(user_id), version, options["TTL"])
+    return version
+
+def set_claims_version(user_id, version):
+    options = settings.AUTH_CLAIMS_VERSION
+    if options["ENABLED"]:
+        cache.set(_claims_version_key(user_id), version, options["TTL"])
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[CLAIMS_VERSION_CLAIM] = claims_version(user)
+
+def reissue_access_token(validated_token, user):
+    """New access token for the same session and expiry, with claims rebuilt from ``user``."""
+    access = AccessToken()
+    for claim, value in validated_token.payload.items():
+        if claim not in ('jti', 'iat'):
+            access[claim] = value
+    set_user_claims(access, user)
+    return access
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying ``USER_CLAIMS``; access tokens derived from it copy them.
+    Blacklist checks go through the in-process bloom filter (``authentication.blacklist``).
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+    def check_blacklist(self):
+        # Tidak ada di filter berarti pasti belum di-blacklist, query database dilewati
+        if blacklist_filter.might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -1,91 +1,113 @@
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.http import HttpResponse
-from django.core.cache import cache
-from django.contrib.auth import login
+from django.contrib.auth.models import update_last_login
 
 from rest_framework import status
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.views import TokenRefreshView
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
-from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework.permissions import IsAuthenticated
 
+from authentication.activity import last_seen_tracker
+from authentication.auth import CookieJWTClaimsAuthentication
+from authentication.hashing import acheck_hex_color, acheck_user_password, amake_password
 from authentication.models import CustomUser
+from authentication.ratelimit import ForgotPasswordFailureThrottle, LoginFailureThrottle, LoginThrottle
+from authentication.tokens import ClaimsRefreshToken, reissue_access_token, set_user_claims
 from authentication.serializers import LoginSerializer, RegisterSerializer, VerifyColorSerializer, UserSerializer
-from utils import api_response
+from utils import AsyncAPIView, api_response
 
 def hello_pawcat(request):
     return HttpResponse("hello pawcat")
 
-class RateLimiter:
-    @staticmethod
-    def is_rate_limited(key, limit=3, timeout=300):
-        failures = cache.get(key, 0)
-        if failures >= limit:
-            return True
-        return False
-
-    @staticmethod
-    def increment_failures(key, timeout=300):
-        failures = cache.get(key, 0)
-        cache.set(key, failures + 1, timeout=timeout)
-
-    @staticmethod
-    def reset_attempts(key):
-        cache.delete(key)
-
-class RegisterView(APIView):
-    def post(self, request):
+def set_csrf_cookie(response, csrf_token):
+    # Dikirim balik lewat header X-CSRF-Token (double-submit). Nilainya juga ada di body
+    # login/refresh karena SPA di origin lain tidak bisa membaca cookie domain API.
+    response.set_cookie(
+        key=settings.JWT_CSRF_COOKIE_NAME,
+        value=csrf_token,
+        httponly=False,
+        secure=True,
+        samesite="None"
+    )
+
+def set_access_cookie(response, access_token):
+    response.set_cookie(
+        key='access_token',
+        value=access_token,
+        httponly=True,
+        secure=True,
+        samesite="None"
+    )
+
+# Register, login dan forgot-password async: hashing berjalan di authentication.hashing,
+# event loop tetap bebas dan request ditolak 503 saat antrean hashing penuh
+class RegisterView(AsyncAPIView):
+    async def post(self, request):
         serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
+        if await sync_to_async(serializer.is_valid)():
+            encoded_password = await amake_password(serializer.validated_data['password'])
+            await sync_to_async(serializer.save)(encoded_password=encoded_password)
             return api_response(status.HTTP_201_CREATED, "User registered successfully")
         return api_response(status.HTTP_400_BAD_REQUEST, "Validation error", serializer.errors)
 
-class LoginView(APIView):
-    def post(self, request):
-        key = f"login_attempts_{request.data.get('username_or_email')}"
-        if RateLimiter.is_rate_limited(key):
-            return api_response(status.HTTP_429_TOO_MANY_REQUESTS, "Too many login attempts. Try again later.")
+class LoginView(AsyncAPIView):
+    # Dicek sebelum handler jalan, jadi percobaan yang diblokir tidak sampai ke hashing password
+    throttle_classes = [LoginThrottle, LoginFailureThrottle]
 
+    async def post(self, request):
         serializer = LoginSerializer(data=request.data)
-        if serializer.is_valid():
-            RateLimiter.reset_attempts(key)
-            user = CustomUser.objects.get(id=serializer.validated_data['user_id'])
-
-            # Hapus token lama sebelum membuat yang baru
-            OutstandingToken.objects.filter(user=user).delete()
-
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
-
-            login(request, user)
-            
-            response = api_response(status.HTTP_200_OK, "Login successful", {
-                'user_id': serializer.validated_data['user_id'],
-                'username': user.username,
-            })
+        if await sync_to_async(serializer.is_valid)():
+            user = serializer.validated_data['user']
+            if await acheck_user_password(user, serializer.validated_data['password']):
+                return await sync_to_async(self.login)(request, user)
+            errors = {'non_field_errors': ['Invalid credentials']}
+        else:
+            errors = serializer.errors
+
+        return api_response(status.HTTP_400_BAD_REQUEST, "Invalid credentials", errors)
+
+    def login(self, request, user):
+        LoginFailureThrottle.reset(request)
+
+        # Generate JWT tokens, klaim user ikut di dalamnya. Token lama yang kedaluwarsa
+        # dibersihkan di luar request oleh `manage.py prune_tokens`.
+        refresh = ClaimsRefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+
+        # Cukup catat last_login; API memakai JWT di cookie, tidak perlu session database
+        update_last_login(None, user)
+        last_seen_tracker.touch(user.id)
+        csrf_token = secrets.token_urlsafe(32)
         
-            response.set_cookie(
-                key='refresh_token',
-                value=str(refresh),
-                httponly=True,
-                secure=True, # Safari = False
-                samesite="None"
-            )
-            response.set_cookie(
-                key='access_token',
-                value=access_token,
-                httponly=True,
-                secure=True, # Safari = False
-                samesite="None"
-            )
+        response = api_response(status.HTTP_200_OK, "Login successful", {
+            'user_id': user.id,
+            'username': user.username,
+            'csrf_token': csrf_token,
+        })
+
+        response.set_cookie(
+            key='refresh_token',
+            value=str(refresh),
+            httponly=True,
+            secure=True, # Safari = False
+            samesite="None"
+        )
+        response.set_cookie(
+            key='access_token',
+            value=access_token,
+            httponly=True,
+            secure=True, # Safari = False
+            samesite="None"
+        )
+        set_csrf_cookie(response, csrf_token)
 
-            return response
-        
-        RateLimiter.increment_failures(key)
-        return api_response(status.HTTP_400_BAD_REQUEST, "Invalid credentials", serializer.errors)
+        return response
     
 class LogoutView(APIView):
     def post(self, request):
@@ -94,7 +116,7 @@ class LogoutView(APIView):
             return api_response(status.HTTP_400_BAD_REQUEST, "No refresh token found")
         
         try:
-            refresh = RefreshToken(refresh_token)
+            refresh = ClaimsRefreshToken(refresh_token)
             refresh.blacklist()
         except Exception as e:
             return api_response(status.HTTP_400_BAD_REQUEST, "Error blacklisting token", str(e))
@@ -102,29 +124,33 @@ class LogoutView(APIView):
         response = api_response(status.HTTP_200_OK, "Logout successful")
         response.delete_cookie('refresh_token', path='/', domain=None) 
         response.delete_cookie('access_token', path='/', domain=None) 
+        response.delete_cookie(settings.JWT_CSRF_COOKIE_NAME, path='/', domain=None)
         return response
 
-class ForgotPasswordView(APIView):
-     def post(self, request):
-        key = f"forgot_password_attempts_{request.data.get('username_or_email')}"
-        if RateLimiter.is_rate_limited(key):
-            return api_response(status.HTTP_429_TOO_MANY_REQUESTS, "Too many attempts. Try again later.")
+class ForgotPasswordView(AsyncAPIView):
+     throttle_classes = [ForgotPasswordFailureThrottle]
 
+     async def post(self, request):
         serializer = VerifyColorSerializer(data=request.data)
-        if serializer.is_valid():
-            RateLimiter.reset_attempts(key)
+        if await sync_to_async(serializer.is_valid)():
             user = serializer.validated_data["user"]
-            new_password = request.data.get("new_password")
+            if await acheck_hex_color(user, serializer.validated_data["hex_color"]):
+                await sync_to_async(ForgotPasswordFailureThrottle.reset)(request)
+                new_password = request.data.get("new_password")
 
-            if not new_password:
-                return api_response(status.HTTP_400_BAD_REQUEST, "New password is required")
+                if not new_password:
+                    return api_response(status.HTTP_400_BAD_REQUEST, "New password is required")
 
-            user.set_password(new_password)
-            user.save()
+                user.password = await amake_password(new_password)
+                # Hanya password; saldo/friends_count/last_seen bisa berubah selama hashing
+                await sync_to_async(user.save)(update_fields=['password'])
 
-            return api_response(status.HTTP_200_OK, "Password changed successfully")
+                return api_response(status.HTTP_200_OK, "Password changed successfully")
+            errors = {"message": ["Invalid hex color"]}
+        else:
+            errors = serializer.errors
 
-        return api_response(status.HTTP_400_BAD_REQUEST, "Verification failed", serializer.errors)
+        return api_response(status.HTTP_400_BAD_REQUEST, "Verification failed", errors)
      
 class CookieTokenRefreshView(TokenRefreshView):
     def post(self, request):
@@ -133,23 +159,27 @@ class CookieTokenRefreshView(TokenRefreshView):
             return api_response(status.HTTP_400_BAD_REQUEST, "No refresh token found")
        
         try:
-            refresh = RefreshToken(refresh_token)
-            access_token = str(refresh.access_token)
-
-            response = api_response(status.HTTP_200_OK, "Token refreshed")
-            response.set_cookie(
-                key='access_token',
-                value=access_token,
-                httponly=True,
-                secure=True,
-                samesite="None"
-            )
+            refresh = ClaimsRefreshToken(refresh_token)
+
+            # Klaim dibangun ulang dari database, bukan disalin dari refresh token lama
+            user = CustomUser.objects.filter(id=refresh.get(api_settings.USER_ID_CLAIM), is_active=True).first()
+            if user is None:
+                return api_response(status.HTTP_400_BAD_REQUEST, "Invalid refresh token")
+            access = refresh.access_token
+            set_user_claims(access, user)
+
+            csrf_token = request.COOKIES.get(settings.JWT_CSRF_COOKIE_NAME) or secrets.token_urlsafe(32)
+            response = api_response(status.HTTP_200_OK, "Token refreshed", {'csrf_token': csrf_token})
+            set_access_cookie(response, str(access))
+            set_csrf_cookie(response, csrf_token)
             return response
         
-        except InvalidToken:
+        except (InvalidToken, TokenError):
             return api_response(status.HTTP_400_BAD_REQUEST, "Invalid refresh token")
         
 class UserInfoView(APIView):
+    # Dijawab dari klaim token tanpa query selama versinya masih sama
+    authentication_classes = [CookieJWTClaimsAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -165,4 +195,9 @@ class UserInfoView(APIView):
             'is_admin': user.is_staff,
             'is_superuser': user.is_superuser,
         }
-        return api_response(status.HTTP_200_OK, "User info retrieved successfully", data)
\ No newline at end of file
+        response = api_response(status.HTTP_200_OK, "User info retrieved successfully", data)
+
+        if not isinstance(user, TokenUser):
+            # Klaim di token sudah basi (atau token lama tanpa klaim), kirim access token baru
+            set_access_cookie(response, str(reissue_access_token(request.auth, user)))
+        return response
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Path-scoped middleware for the sessionless API profile (``settings.SESSIONLESS_API``).
+
+API views authenticate with the JWT cookie (``authentication.auth``) and never use
+sessions, messages or Django's CSRF cookie, so for ``SESSIONLESS_API_PREFIXES`` these
+wrappers hand the request straight to the next layer. Everything else, ``/admin/``
+included, still runs the wrapped middleware unchanged.
+"""
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_sessionless_path(path):
+    return path.startswith(tuple(settings.SESSIONLESS_API_PREFIXES))
+
+
+class SkipForApiMixin:
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if is_sessionless_path(request.path_info):
+            return self.get_response(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if is_sessionless_path(request.path_info):
+            return await self.get_response(request)
+        return await super().__acall__(request)
+
+
+class NonApiSessionMiddleware(SkipForApiMixin, SessionMiddleware):
+    pass
+
+
+class NonApiCsrfViewMiddleware(SkipForApiMixin, CsrfViewMiddleware):
+    # process_view dipanggil handler di luar __call__, jadi perlu dilewati sendiri
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_sessionless_path(request.path_info):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class NonApiAuthenticationMiddleware(SkipForApiMixin, AuthenticationMiddleware):
+    pass
+
+
+class NonApiMessageMiddleware(SkipForApiMixin, MessageMiddleware):
+    pass
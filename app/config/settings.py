@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
 
     'rest_framework',
@@ -66,6 +67,25 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Profil API tanpa session: route di bawah SESSIONLESS_API_PREFIXES melewati session, CSRF, auth dan messages
+# middleware (lihat config/middleware.py); /admin/ tetap memakai session penuh.
+SESSIONLESS_API = os.getenv("SESSIONLESS_API", "false").lower() == "true"
+SESSIONLESS_API_PREFIXES = ("/api/",)
+SESSIONLESS_MIDDLEWARE_REPLACEMENTS = {
+    'django.contrib.sessions.middleware.SessionMiddleware': 'config.middleware.NonApiSessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware': 'config.middleware.NonApiCsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware': 'config.middleware.NonApiAuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware': 'config.middleware.NonApiMessageMiddleware',
+}
+if SESSIONLESS_API:
+    MIDDLEWARE = [SESSIONLESS_MIDDLEWARE_REPLACEMENTS.get(middleware, middleware) for middleware in MIDDLEWARE]
+
+# Double-submit CSRF untuk JWT di cookie: request yang mengubah data harus mengirim header
+# X-CSRF-Token yang sama dengan cookie JWT_CSRF_COOKIE_NAME. Default mengikuti profil sessionless.
+JWT_CSRF_CHECK = os.getenv("JWT_CSRF_CHECK", str(SESSIONLESS_API)).lower() == "true"
+JWT_CSRF_COOKIE_NAME = "csrf_token"
+JWT_CSRF_HEADER_NAME = "HTTP_X_CSRF_TOKEN"
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
 ]
@@ -74,6 +94,7 @@ CORS_ALLOW_HEADERS = [
     "content-type",
     "authorization",
     "x-csrftoken",
+    "x-csrf-token",
     "x-requested-with",
 ]
 
@@ -141,6 +162,9 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
+    # IP klien untuk throttling; tanpa ini X-Forwarded-For dari klien dipercaya mentah-mentah.
+    # 0 = REMOTE_ADDR, set ke jumlah reverse proxy di depan aplikasi (1 di belakang ingress)
+    'NUM_PROXIES': int(os.getenv("NUM_PROXIES", "0")),
 }
 
 SIMPLE_JWT = {
@@ -153,6 +177,97 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = "authentication.CustomUser"
 
+# Bloom filter JTI yang di-blacklist (authentication.blacklist), dibangun ulang per proses
+TOKEN_BLACKLIST_FILTER = {
+    # Logout di satu worker hanya sampai ke worker lain lewat cache bersama; tanpa REDIS_URL
+    # filter dimatikan dan setiap refresh memeriksa database, supaya token yang di-logout langsung ditolak
+    "ENABLED": os.getenv("TOKEN_BLACKLIST_FILTER_ENABLED", str(bool(os.getenv("REDIS_URL")))).lower() == "true",
+    "REBUILD_INTERVAL": int(os.getenv("TOKEN_BLACKLIST_FILTER_REBUILD_INTERVAL", "300")),
+    "ERROR_RATE": 0.001,
+    "MIN_CAPACITY": 10000,
+    "CHUNK_SIZE": 5000,
+}
+# Pembersihan token kedaluwarsa (manage.py prune_tokens)
+TOKEN_PRUNE_CHUNK_SIZE = int(os.getenv("TOKEN_PRUNE_CHUNK_SIZE", "5000"))
+
+# Worker pool for password/hex-color hashing in the async auth views (authentication.hashing)
+PASSWORD_HASHING_POOL = {
+    "MAX_WORKERS": int(os.getenv("PASSWORD_HASHING_WORKERS", str(os.cpu_count() or 1))),
+    # Hash yang boleh antre di atas MAX_WORKERS; request berikutnya langsung 503
+    "MAX_QUEUE": int(os.getenv("PASSWORD_HASHING_MAX_QUEUE", "32")),
+    "RETRY_AFTER": 1,
+}
+
+# Per-process cache of user rows in CookieJWTAuthentication (authentication.auth.UserCache)
+AUTH_USER_CACHE = {
+    # Invalidasi lewat cache bersama; dengan LocMem worker lain tidak tahu user dinonaktifkan/dihapus,
+    # jadi default hanya aktif kalau REDIS_URL diset (atau dipaksa untuk deployment satu proses)
+    "ENABLED": os.getenv("AUTH_USER_CACHE_ENABLED", str(bool(os.getenv("REDIS_URL")))).lower() == "true",
+    "MAX_SIZE": int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", "1024")),
+    "TTL": int(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+}
+# last_seen dicatat di memori saat autentikasi dan ditulis sekali per interval (authentication.activity)
+LAST_SEEN = {
+    "FLUSH_INTERVAL": int(os.getenv("LAST_SEEN_FLUSH_INTERVAL", "60")),
+}
+# Versi klaim token (authentication.tokens) disimpan di cache sebelum dibaca ulang dari database
+AUTH_CLAIMS_VERSION = {
+    # Perubahan user hanya sampai ke worker lain lewat cache bersama; tanpa REDIS_URL versi dibaca
+    # dari database setiap request, supaya klaim user yang diturunkan/dinonaktifkan langsung ditolak
+    "ENABLED": os.getenv("AUTH_CLAIMS_VERSION_CACHE_ENABLED", str(bool(os.getenv("REDIS_URL")))).lower() == "true",
+    "TTL": int(os.getenv("AUTH_CLAIMS_VERSION_TTL", "300")),
+}
+
+# Cache bersama antar worker (rate limit, versi user/klaim) butuh Redis; tanpa REDIS_URL tiap proses punya LocMem sendiri
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+if os.getenv("REDIS_URL"):
+    CACHES["default"] = {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.getenv("REDIS_URL")}
+
+# Sliding-window rate limits (authentication.ratelimit), scope: (limit, window dalam detik)
+RATE_LIMITS = {
+    "CACHE": os.getenv("RATE_LIMIT_CACHE", "default"),
+    "RATES": {
+        "login": (30, 60),
+        "login_failures_ip": (20, 300),
+        "login_failures_account": (3, 300),
+        "forgot_password_failures_ip": (20, 300),
+        "forgot_password_failures_account": (3, 300),
+    },
+}
+
+# Notification push over Server-Sent Events (served by config.asgi)
+NOTIFICATION_HUB_BACKEND = os.getenv("NOTIFICATION_HUB_BACKEND", "user.hub.InProcessNotificationHub")
+NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15"))
+
+# Friends-of-friends suggestions (user.services.suggest_friends)
+FRIEND_SUGGESTIONS = {
+    "LIMIT": 20,
+    "CACHE_TTL": 600,
+    # Sampai derajat ini dihitung di memori dari adjacency set yang di-cache, di atasnya pakai self-join
+    "IN_MEMORY_MAX_DEGREE": 50,
+    # Batas jumlah edge friend-of-friend yang diperiksa per perhitungan
+    "MAX_SECOND_DEGREE": 5000,
+}
+
+FRIENDS_LEADERBOARD = {
+    "CACHE_TTL": 60,
+}
+
+# Window default endpoint aktivitas user admin (admin_dashboard.views.user_activity), bisa diganti lewat ?window_days=
+ADMIN_ACTIVITY = {
+    "WINDOW_DAYS": int(os.getenv("ADMIN_ACTIVITY_WINDOW_DAYS", "150")),
+    "MAX_WINDOW_DAYS": 3650,
+}
+
+# Retention policy applied by `manage.py prune_notifications` (0 disables a rule)
+NOTIFICATION_RETENTION = {
+    "MAX_AGE_DAYS": int(os.getenv("NOTIFICATION_MAX_AGE_DAYS", "180")),
+    "MAX_PER_USER": int(os.getenv("NOTIFICATION_MAX_PER_USER", "500")),
+    "CHUNK_SIZE": int(os.getenv("NOTIFICATION_PRUNE_CHUNK_SIZE", "5000")),
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
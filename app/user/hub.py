@@ -0,0 +1,100 @@
+"""
+Pub/sub hub used to push notifications to Server-Sent Events streams.
+
+The hub only carries lightweight events: ``{"id": <notification id>, "payload": {...}}``
+for a single receiver, or ``{"id": None}`` for a broadcast, which tells every
+stream to catch up from the database. Streams always fall back to the database
+for resume and overflow, so a backend may drop events without losing data.
+
+The backend is chosen with ``settings.NOTIFICATION_HUB_BACKEND`` so a
+multi-process implementation (Redis, Postgres LISTEN/NOTIFY, ...) can replace
+the in-process one by implementing ``subscribe``, ``unsubscribe`` and ``publish``.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    def __init__(self, user_id, loop, maxsize=100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # Set when events were dropped, the stream has to resync from the database
+        self.overflowed = False
+
+    def push(self, event):
+        # Called from any thread; the queue itself belongs to the subscriber's event loop
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Event loop already closed, the stream is gone
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class BaseNotificationHub:
+    def subscribe(self, user_id):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, receiver_id, event):
+        """Deliver ``event`` to ``receiver_id``, or to everyone when ``receiver_id`` is None."""
+        raise NotImplementedError
+
+
+class InProcessNotificationHub(BaseNotificationHub):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+
+    def publish(self, receiver_id, event):
+        with self._lock:
+            if receiver_id is None:
+                targets = [sub for subs in self._subscribers.values() for sub in subs]
+            else:
+                targets = list(self._subscribers.get(receiver_id, ()))
+
+        for subscription in targets:
+            subscription.push(event)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = import_string(settings.NOTIFICATION_HUB_BACKEND)()
+    return _hub
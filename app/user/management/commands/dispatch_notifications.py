@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from user.models import ScheduledNotification
+from user.services import deliver_direct_notifications, deliver_notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver scheduled notifications that are due. Several dispatchers can run in parallel: "
+        "rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED so each one is sent exactly once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Scheduled notifications claimed per transaction")
+        parser.add_argument('--interval', type=float, default=5,
+                            help="Seconds to wait when nothing is due")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no due notification is left instead of polling")
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        total = 0
+        while True:
+            delivered = self.dispatch(batch_size)
+            total += delivered
+            if delivered:
+                self.stdout.write(f"Delivered {delivered} scheduled notifications")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered {total} scheduled notifications in total"))
+
+    def dispatch(self, batch_size):
+        with transaction.atomic():
+            # Baris yang sedang dikunci dispatcher lain dilewati, bukan ditunggu
+            due = list(
+                ScheduledNotification.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', send_at__lte=now())
+                .order_by('send_at', 'id')[:batch_size]
+            )
+            if not due:
+                return 0
+
+            direct = [item for item in due if item.receiver_id is not None]
+            batches = deliver_direct_notifications([
+                (item.sender_id, item.receiver_id, item.title, item.message) for item in direct
+            ])
+            for item, batch in zip(direct, batches):
+                item.batch = batch
+
+            for item in due:
+                if item.receiver_id is None:
+                    item.batch = deliver_notification(item.sender_id, item.title, item.message)
+                item.status = 'sent'
+                item.sent_at = now()
+
+            ScheduledNotification.objects.bulk_update(due, ['status', 'sent_at', 'batch'])
+        return len(due)
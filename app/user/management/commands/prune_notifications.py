@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Min
+from django.utils.timezone import now
+
+from user.models import Notification
+
+
+class Command(BaseCommand):
+    help = "Delete notifications beyond the retention policy in small primary-key chunks"
+
+    def add_arguments(self, parser):
+        retention = settings.NOTIFICATION_RETENTION
+        parser.add_argument('--max-age-days', type=int, default=retention['MAX_AGE_DAYS'],
+                            help="Delete notifications older than this many days (0 disables)")
+        parser.add_argument('--max-per-user', type=int, default=retention['MAX_PER_USER'],
+                            help="Keep at most this many notifications per receiver (0 disables)")
+        parser.add_argument('--chunk-size', type=int, default=retention['CHUNK_SIZE'],
+                            help="Primary-key range deleted per statement")
+        parser.add_argument('--sleep', type=float, default=0,
+                            help="Seconds to pause between chunks")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the rows that would be deleted")
+
+    def handle(self, *args, **options):
+        self.chunk_size = max(options['chunk_size'], 1)
+        self.sleep = options['sleep']
+        self.dry_run = options['dry_run']
+
+        cutoff = None
+        if options['max_age_days'] > 0:
+            cutoff = now() - timedelta(days=options['max_age_days'])
+
+        started = time.monotonic()
+        removed_by_age = self.prune_by_age(cutoff) if cutoff else 0
+        removed_by_count = 0
+        if options['max_per_user'] > 0:
+            removed_by_count = self.prune_by_count(options['max_per_user'], cutoff)
+        elapsed = time.monotonic() - started
+
+        total = removed_by_age + removed_by_count
+        verb = "Would delete" if self.dry_run else "Deleted"
+        rate = total / elapsed if elapsed > 0 else total
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {total} notifications ({removed_by_age} by age, {removed_by_count} by per-user limit) "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        ))
+
+    def prune_by_age(self, cutoff):
+        expired = Notification.objects.filter(created_at__lt=cutoff)
+        if self.dry_run:
+            return expired.count()
+
+        # id mengikuti urutan created_at, jadi batas atas cukup dari baris expired terbaru
+        upper = expired.order_by('-created_at').values_list('id', flat=True).first()
+        if upper is None:
+            return 0
+        lower = Notification.objects.aggregate(lower=Min('id'))['lower']
+
+        removed = 0
+        while lower <= upper:
+            deleted, _ = expired.filter(id__gte=lower, id__lt=lower + self.chunk_size).delete()
+            removed += deleted
+            lower += self.chunk_size
+            self.pause()
+        return removed
+
+    def prune_by_count(self, max_per_user, cutoff):
+        notifications = Notification.objects.all()
+        if cutoff:
+            notifications = notifications.filter(created_at__gte=cutoff)
+
+        over_limit = notifications.values('receiver_id').annotate(total=Count('id')).filter(total__gt=max_per_user)
+        if self.dry_run:
+            return sum(row['total'] - max_per_user for row in over_limit)
+
+        removed = 0
+        for row in over_limit.iterator():
+            received = notifications.filter(receiver_id=row['receiver_id']).order_by('-created_at', '-id')
+            while True:
+                ids = list(received.values_list('id', flat=True)[max_per_user:max_per_user + self.chunk_size])
+                if not ids:
+                    break
+                deleted, _ = Notification.objects.filter(id__in=ids).delete()
+                removed += deleted
+                self.pause()
+        return removed
+
+    def pause(self):
+        if self.sleep:
+            time.sleep(self.sleep)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from authentication.auth import invalidate_cached_users
+from authentication.models import CustomUser
+from user.models import FriendEdge
+
+
+class Command(BaseCommand):
+    help = "Recompute CustomUser.friends_count from FriendEdge for every user in one statement"
+
+    def handle(self, *args, **options):
+        actual = Coalesce(
+            Subquery(
+                FriendEdge.objects.filter(user_id=OuterRef('pk'))
+                .order_by().values('user_id').annotate(total=Count('id')).values('total'),
+                output_field=IntegerField()
+            ),
+            Value(0)
+        )
+        drifted = list(CustomUser.objects.exclude(friends_count=actual).values_list('id', flat=True))
+        repaired = CustomUser.objects.filter(id__in=drifted).update(friends_count=actual)
+        invalidate_cached_users(drifted)
+        self.stdout.write(self.style.SUCCESS(f"Repaired friends_count for {repaired} users"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2025-05-03 10:12
+
+from html import escape
+
+from django.db import migrations, models
+
+
+def render_existing(apps, schema_editor):
+    Notification = apps.get_model('user', 'Notification')
+    batch = []
+    for notification in Notification.objects.only('id', 'title', 'message').iterator(chunk_size=2000):
+        notification.rendered_title = escape(notification.title)
+        notification.rendered_message = escape(notification.message)
+        batch.append(notification)
+        if len(batch) >= 2000:
+            Notification.objects.bulk_update(batch, ['rendered_title', 'rendered_message'])
+            batch = []
+    if batch:
+        Notification.objects.bulk_update(batch, ['rendered_title', 'rendered_message'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_friendship'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='rendered_message',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='rendered_title',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
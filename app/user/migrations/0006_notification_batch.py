@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2025-05-08 14:03
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.db.models.functions import Trunc
+
+
+def backfill_batches(apps, schema_editor):
+    # Notifikasi lama dikelompokkan per pengirim, isi, dan menit pengiriman
+    Notification = apps.get_model('user', 'Notification')
+    NotificationBatch = apps.get_model('user', 'NotificationBatch')
+
+    groups = (
+        Notification.objects.filter(batch__isnull=True)
+        .annotate(sent_minute=Trunc('created_at', 'minute'))
+        .values('sender_id', 'title', 'message', 'sent_minute')
+        .annotate(recipient_count=Count('id'), first_sent=Min('created_at'))
+        .order_by('sent_minute')
+    )
+    for group in groups.iterator():
+        batch = NotificationBatch.objects.create(
+            title=group['title'],
+            message=group['message'],
+            sender_id=group['sender_id'],
+            recipient_count=group['recipient_count'],
+        )
+        NotificationBatch.objects.filter(id=batch.id).update(created_at=group['first_sent'])
+        Notification.objects.filter(
+            batch__isnull=True,
+            sender_id=group['sender_id'],
+            title=group['title'],
+            message=group['message'],
+            created_at__gte=group['sent_minute'],
+            created_at__lt=group['sent_minute'] + timedelta(minutes=1),
+        ).update(batch=batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_notification_retention_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('recipient_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='batch',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='user.notificationbatch'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['batch', 'id'], name='notification_batch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationbatch',
+            index=models.Index(fields=['-created_at', '-id'], name='notif_batch_created_idx'),
+        ),
+        migrations.RunPython(backfill_batches, migrations.RunPython.noop),
+    ]
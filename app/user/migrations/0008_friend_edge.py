@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2025-05-15 11:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_scheduled_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('friend', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='friend_of_edges', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='friend_edges', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'friend'), name='unique_friend_edge')],
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO user_friendedge (user_id, friend_id, created_at)
+            SELECT sender_id, receiver_id, created_at FROM user_friendship WHERE status = 'accepted'
+            UNION ALL
+            SELECT receiver_id, sender_id, created_at FROM user_friendship WHERE status = 'accepted'
+            ON CONFLICT DO NOTHING
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2025-05-17 10:07
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_friend_edge'),
+        ('authentication', '0010_customuser_friends_count'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            UPDATE authentication_customuser AS u
+            SET friends_count = edges.total
+            FROM (SELECT user_id, COUNT(*) AS total FROM user_friendedge GROUP BY user_id) AS edges
+            WHERE edges.user_id = u.id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
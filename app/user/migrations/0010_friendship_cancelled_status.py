@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2025-05-24 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0009_backfill_friends_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='friendship',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], default='pending', max_length=10),
+        ),
+    ]
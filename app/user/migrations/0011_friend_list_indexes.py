@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2025-05-27 09:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_friendship_cancelled_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendedge',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='friend_edge_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['receiver', '-created_at', '-id'], name='friendship_pending_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['sender', '-created_at', '-id'], name='friendship_pending_out_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2025-05-29 10:05
+
+from html import escape
+
+from django.db import migrations, models
+
+
+def render_existing(apps, schema_editor):
+    NotificationBatch = apps.get_model('user', 'NotificationBatch')
+    batch = []
+    for notification_batch in NotificationBatch.objects.only('id', 'title', 'message').iterator(chunk_size=2000):
+        notification_batch.rendered_title = escape(notification_batch.title)
+        notification_batch.rendered_message = escape(notification_batch.message)
+        batch.append(notification_batch)
+        if len(batch) >= 2000:
+            NotificationBatch.objects.bulk_update(batch, ['rendered_title', 'rendered_message'])
+            batch = []
+    if batch:
+        NotificationBatch.objects.bulk_update(batch, ['rendered_title', 'rendered_message'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_friend_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='rendered_message',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='rendered_title',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
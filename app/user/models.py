@@ -1,23 +1,131 @@
+from html import escape
+
 from django.db import models
+from django.utils import timezone
 from django.forms import ValidationError
 
 from authentication.models import CustomUser
 
-class Notification(models.Model):
+class RenderedQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.render()
+        return super().bulk_create(objs, *args, **kwargs)
+
+class NotificationQuerySet(RenderedQuerySet):
+    PAYLOAD_FIELDS = ('id', 'rendered_title', 'rendered_message', 'created_at', 'sender_id', 'receiver_id')
+
+    def payloads(self):
+        # Baca langsung kolom yang sudah di-render, tanpa serializer per baris
+        return [
+            Notification.build_payload(*row)
+            for row in self.values_list(*self.PAYLOAD_FIELDS)
+        ]
+
+class RenderedMixin:
+    # title dan message disimpan apa adanya; versi ter-escape dihitung sekali saat ditulis
+    def render(self):
+        self.rendered_title = escape(self.title)
+        self.rendered_message = escape(self.message)
+
+    def save(self, *args, **kwargs):
+        self.render()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'title', 'message'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'rendered_title', 'rendered_message'}
+        super().save(*args, **kwargs)
+
+class NotificationBatch(RenderedMixin, models.Model):
+    # Satu event pengiriman; Notification adalah baris per penerima
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    rendered_title = models.TextField(editable=False, default='')
+    rendered_message = models.TextField(editable=False, default='')
+    sender = models.ForeignKey(CustomUser, related_name='notification_batches', on_delete=models.CASCADE)
+    recipient_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = RenderedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='notif_batch_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.recipient_count})"
+
+class Notification(RenderedMixin, models.Model):
     title = models.CharField(max_length=255)
     message = models.TextField()
+    rendered_title = models.TextField(editable=False, default='')
+    rendered_message = models.TextField(editable=False, default='')
     sender = models.ForeignKey(CustomUser, related_name='sent_notifications', on_delete=models.CASCADE)
     receiver = models.ForeignKey(CustomUser, related_name='received_notifications', on_delete=models.CASCADE, null=True, blank=True)
+    batch = models.ForeignKey(NotificationBatch, related_name='notifications', on_delete=models.CASCADE, null=True, blank=True, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+            models.Index(fields=['receiver', '-created_at'], name='notification_receiver_idx'),
+            models.Index(fields=['batch', 'id'], name='notification_batch_idx'),
+        ]
+
+    @staticmethod
+    def build_payload(id, title, message, created_at, sender, receiver):
+        return {
+            'id': id,
+            'title': title,
+            'message': message,
+            'created_at': timezone.localtime(created_at).isoformat() if created_at else None,
+            'sender': sender,
+            'receiver': receiver,
+        }
+
+    def payload(self):
+        return self.build_payload(
+            self.id, self.rendered_title, self.rendered_message,
+            self.created_at, self.sender_id, self.receiver_id
+        )
+
     def __str__(self):
         return self.title
 
+class ScheduledNotification(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+    ]
+
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    sender = models.ForeignKey(CustomUser, related_name='scheduled_notifications', on_delete=models.CASCADE)
+    receiver = models.ForeignKey(CustomUser, related_name='+', on_delete=models.CASCADE, null=True, blank=True)  # null = semua user
+    send_at = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    batch = models.ForeignKey(NotificationBatch, related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Dispatcher hanya memindai baris pending yang sudah jatuh tempo
+            models.Index(fields=['send_at', 'id'], name='scheduled_notif_due_idx', condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f"{self.title} @ {self.send_at} ({self.status})"
+
 class Friendship(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('accepted', 'Accepted'),
         ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
     ]
 
     sender = models.ForeignKey(CustomUser, related_name="sent_requests", on_delete=models.CASCADE)
@@ -27,10 +135,32 @@ class Friendship(models.Model):
 
     class Meta:
         unique_together = ('sender', 'receiver')  # Mencegah duplikasi request yang sama
+        indexes = [
+            # Daftar pending masuk/keluar, keyset pada (created_at, id)
+            models.Index(fields=['receiver', '-created_at', '-id'], name='friendship_pending_in_idx', condition=models.Q(status='pending')),
+            models.Index(fields=['sender', '-created_at', '-id'], name='friendship_pending_out_idx', condition=models.Q(status='pending')),
+        ]
 
     def clean(self):
         if self.sender == self.receiver:
             raise ValidationError("Cannot add yourself as a friend")
         
     def __str__(self):
-        return f"{self.sender} -> {self.receiver} ({self.status})"
\ No newline at end of file
+        return f"{self.sender} -> {self.receiver} ({self.status})"
+
+class FriendEdge(models.Model):
+    # Cermin simetris dari Friendship yang accepted, satu baris per arah (user -> friend)
+    user = models.ForeignKey(CustomUser, related_name='friend_edges', on_delete=models.CASCADE, db_index=False)
+    friend = models.ForeignKey(CustomUser, related_name='friend_of_edges', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'friend'], name='unique_friend_edge'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='friend_edge_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} <-> {self.friend_id}"
@@ -1,44 +1,41 @@
-from html import escape
 from rest_framework import serializers
 
 from authentication.models import BankDetail, CustomUser, PaymentMethod
-from user.models import Friendship, Notification
+from user.models import Friendship, Notification, NotificationBatch
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'avatar_id']
 
-class NotificationSerializer(serializers.ModelSerializer):
+class FriendUserSerializer(UserSerializer):
+    # Dihitung sekali per halaman lewat mutual_friend_counts, dikirim via context
+    mutual_friends_count = serializers.SerializerMethodField()
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['mutual_friends_count']
+
+    def get_mutual_friends_count(self, obj):
+        return self.context.get('mutual_counts', {}).get(obj.id, 0)
+
+class NotificationBatchSerializer(serializers.ModelSerializer):
+    sender = serializers.SerializerMethodField()
+    title = serializers.CharField(source='rendered_title', read_only=True)
+    message = serializers.CharField(source='rendered_message', read_only=True)
+
+    class Meta:
+        model = NotificationBatch
+        fields = ['id', 'title', 'message', 'sender', 'recipient_count', 'created_at']
+
+    def get_sender(self, obj):
+        return {'id': obj.sender.id, 'username': obj.sender.username}
+
+class NotificationRecipientSerializer(serializers.ModelSerializer):
+    receiver = UserSerializer(read_only=True)
+
     class Meta:
         model = Notification
-        fields = '__all__'
-
-    def validate(self, data):
-        # Make sure title and message exist
-        if not data.get('title'):
-            raise serializers.ValidationError("Title is required")
-        if not data.get('message'):
-            raise serializers.ValidationError("Message is required")
-        
-        # Ensure strings are properly escaped to prevent XSS
-        if 'title' in data and data['title']:
-            data['title'] = escape(str(data['title']).strip())
-        if 'message' in data and data['message']:
-            data['message'] = escape(str(data['message']).strip())
-        
-        return data
-    
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        
-        # Escape any potentially unescaped content
-        if 'title' in representation:
-            representation['title'] = escape(str(representation['title']))
-        if 'message' in representation:
-            representation['message'] = escape(str(representation['message']))
-            
-        return representation
+        fields = ['id', 'receiver', 'created_at']
 
 class FriendshipSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
@@ -72,9 +69,8 @@ class BankDetailSerializer(serializers.ModelSerializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     payment_methods = PaymentMethodSerializer(many=True, read_only=True)
     bank_details = BankDetailSerializer(many=True, read_only=True)
-    friends_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'full_name', 'email', 'avatar_id', 'bio', 'friends_count', 'payment_methods', 'bank_details']
-        read_only_fields = ['email', 'username']  # ini buat kunci supaya gabisa diubah
\ No newline at end of file
+        read_only_fields = ['email', 'username', 'friends_count']  # ini buat kunci supaya gabisa diubah
\ No newline at end of file
@@ -0,0 +1,235 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from authentication.auth import invalidate_cached_users
+from authentication.models import CustomUser
+from user.hub import get_hub
+from user.models import FriendEdge, Friendship, Notification, NotificationBatch
+
+DELIVERY_BATCH_SIZE = 2000
+
+# NOTIFICATION
+def deliver_notification(sender_id, title, message, receiver_id=None, batch_size=DELIVERY_BATCH_SIZE):
+    """
+    Create the send event and its per-recipient rows, then push them to open streams after commit.
+    ``receiver_id=None`` sends to every active user except the sender.
+    """
+    with transaction.atomic():
+        if receiver_id is not None:
+            batch = deliver_direct_notifications([(sender_id, receiver_id, title, message)])[0]
+            return batch
+
+        batch = NotificationBatch.objects.create(title=title, message=message, sender_id=sender_id)
+        recipient_ids = (
+            CustomUser.objects.filter(is_active=True).exclude(id=sender_id)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+        pending = []
+        for recipient_id in recipient_ids.iterator(chunk_size=batch_size):
+            pending.append(Notification(title=title, message=message, sender_id=sender_id, receiver_id=recipient_id, batch=batch))
+            if len(pending) >= batch_size:
+                Notification.objects.bulk_create(pending)
+                batch.recipient_count += len(pending)
+                pending = []
+        if pending:
+            Notification.objects.bulk_create(pending)
+            batch.recipient_count += len(pending)
+        batch.save(update_fields=['recipient_count'])
+
+        # Broadcast tidak membawa payload, setiap stream mengambil notifikasinya sendiri dari DB
+        transaction.on_commit(lambda: get_hub().publish(None, {'id': None}))
+    return batch
+
+def deliver_direct_notifications(items):
+    """
+    Deliver many single-recipient notifications with one insert per table.
+    ``items`` is a list of ``(sender_id, receiver_id, title, message)``; returns the batches in the same order.
+    """
+    with transaction.atomic():
+        batches = NotificationBatch.objects.bulk_create([
+            NotificationBatch(title=title, message=message, sender_id=sender_id, recipient_count=1)
+            for sender_id, _, title, message in items
+        ])
+        notifications = Notification.objects.bulk_create([
+            Notification(title=title, message=message, sender_id=sender_id, receiver_id=receiver_id, batch=batch)
+            for (sender_id, receiver_id, title, message), batch in zip(items, batches)
+        ])
+
+        events = [
+            (notification.receiver_id, {'id': notification.id, 'payload': notification.payload()})
+            for notification in notifications
+        ]
+        transaction.on_commit(lambda: [get_hub().publish(receiver_id, event) for receiver_id, event in events])
+    return batches
+
+
+# FRIENDSHIP
+def _adjacency_key(user_id):
+    return f"friends:adjacency:{user_id}"
+
+def _suggestions_key(user_id):
+    return f"friends:suggestions:{user_id}"
+
+def invalidate_friend_graph(user_ids):
+    keys = [key for user_id in user_ids for key in (_adjacency_key(user_id), _suggestions_key(user_id))]
+    # Setelah commit, supaya pembaca lain tidak mengisi ulang cache dengan data lama
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+def are_friends(user_id, other_id):
+    return FriendEdge.objects.filter(user_id=user_id, friend_id=other_id).exists()
+
+def link_friends(user_id, friend_ids):
+    """Mirror accepted friendships into FriendEdge in both directions; returns the ids that were not linked yet."""
+    friend_ids = set(friend_ids) - {user_id}
+    if not friend_ids:
+        return set()
+
+    # Hitung dari baris yang benar-benar masuk, bukan dari SELECT sebelumnya:
+    # dua accept bersamaan sama-sama melihat "belum ada" dan menambah friends_count dua kali.
+    # Kedua arah dalam satu statement dengan urutan tetap supaya tidak deadlock.
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(FriendEdge._meta.db_table)} (user_id, friend_id, created_at) "
+            f"SELECT pair.user_id, pair.friend_id, now() FROM ("
+            f"SELECT %s AS user_id, unnest(%s::bigint[]) AS friend_id "
+            f"UNION ALL SELECT unnest(%s::bigint[]), %s"
+            f") AS pair ORDER BY pair.user_id, pair.friend_id "
+            f"ON CONFLICT DO NOTHING RETURNING user_id, friend_id",
+            [user_id, list(friend_ids), list(friend_ids), user_id]
+        )
+        new_ids = {friend for owner, friend in cursor.fetchall() if owner == user_id}
+    if new_ids:
+        CustomUser.objects.filter(id=user_id).update(friends_count=F('friends_count') + len(new_ids))
+        CustomUser.objects.filter(id__in=new_ids).update(friends_count=F('friends_count') + 1)
+        invalidate_cached_users({user_id} | new_ids)
+        invalidate_friend_graph({user_id} | new_ids)
+    return new_ids
+
+def unlink_friends(user_id, friend_ids):
+    """Remove both directions of the given friendships; returns the ids that were actually linked."""
+    friend_ids = set(friend_ids) - {user_id}
+    if not friend_ids:
+        return set()
+
+    # Sama seperti link_friends: kurangi hanya untuk baris yang benar-benar terhapus oleh statement ini
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(FriendEdge._meta.db_table)} "
+            f"WHERE (user_id = %s AND friend_id = ANY(%s)) OR (user_id = ANY(%s) AND friend_id = %s) "
+            f"RETURNING user_id, friend_id",
+            [user_id, list(friend_ids), list(friend_ids), user_id]
+        )
+        linked = {friend for owner, friend in cursor.fetchall() if owner == user_id}
+    if linked:
+        CustomUser.objects.filter(id=user_id).update(friends_count=F('friends_count') - len(linked))
+        CustomUser.objects.filter(id__in=linked).update(friends_count=F('friends_count') - 1)
+        invalidate_cached_users({user_id} | linked)
+        invalidate_friend_graph({user_id} | linked)
+    return linked
+
+def mutual_friend_counts(user_id, other_ids):
+    """Return ``{other_id: mutual friend count}`` for a whole page of users in one grouped query."""
+    if not other_ids:
+        return {}
+    my_friends = FriendEdge.objects.filter(user_id=user_id).values('friend_id')
+    return dict(
+        FriendEdge.objects.filter(user_id__in=set(other_ids), friend_id__in=my_friends)
+        .values('user_id')
+        .annotate(mutual=Count('id'))
+        .values_list('user_id', 'mutual')
+    )
+
+def transition_friend_requests(user_id, other_ids, role, new_status):
+    """
+    Move pending requests between ``user_id`` and ``other_ids`` to ``new_status`` with one
+    conditional UPDATE ... RETURNING. ``role`` is the current user's side of the request
+    (``"receiver"`` to accept/reject, ``"sender"`` to cancel). Returns the other ids that changed.
+    Signals do not fire here; callers accepting requests must call ``link_friends``.
+    """
+    if not other_ids:
+        return set()
+
+    own_column, other_column = ('receiver_id', 'sender_id') if role == 'receiver' else ('sender_id', 'receiver_id')
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote(Friendship._meta.db_table)} SET status = %s "
+            f"WHERE {quote(own_column)} = %s AND {quote(other_column)} = ANY(%s) AND status = 'pending' "
+            f"RETURNING {quote(other_column)}",
+            [new_status, user_id, list(other_ids)]
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+def get_friend_ids(user_ids):
+    """Return ``{user_id: set(friend_ids)}``, served from cached adjacency sets where possible."""
+    user_ids = set(user_ids)
+    cached = cache.get_many([_adjacency_key(user_id) for user_id in user_ids])
+    adjacency = {user_id: cached[_adjacency_key(user_id)] for user_id in user_ids if _adjacency_key(user_id) in cached}
+
+    missing = user_ids - adjacency.keys()
+    if missing:
+        loaded = {user_id: set() for user_id in missing}
+        for user_id, friend_id in FriendEdge.objects.filter(user_id__in=missing).values_list('user_id', 'friend_id'):
+            loaded[user_id].add(friend_id)
+        cache.set_many(
+            {_adjacency_key(user_id): friends for user_id, friends in loaded.items()},
+            settings.FRIEND_SUGGESTIONS['CACHE_TTL']
+        )
+        adjacency.update(loaded)
+    return adjacency
+
+def suggest_friends(user_id):
+    """
+    Rank non-friends by mutual-friend count as ``[(user_id, mutual_count), ...]``.
+    Small graphs are counted in memory from cached adjacency sets, large ones with one
+    self-join over FriendEdge. Both stop after ``MAX_SECOND_DEGREE`` friend-of-friend edges.
+    """
+    config = settings.FRIEND_SUGGESTIONS
+    ranked = cache.get(_suggestions_key(user_id))
+    if ranked is None:
+        ranked = _rank_suggestions(user_id, config)
+        cache.set(_suggestions_key(user_id), ranked, config['CACHE_TTL'])
+
+    # Tanpa cache bersama, invalidasi hanya sampai ke worker ini; buang yang sudah jadi teman
+    # dengan satu lookup ke FriendEdge supaya hasil cache worker lain tidak menyarankan teman sendiri
+    already_friends = set(
+        FriendEdge.objects.filter(user_id=user_id, friend_id__in=[candidate for candidate, _ in ranked])
+        .values_list('friend_id', flat=True)
+    ) if ranked else set()
+    return [item for item in ranked if item[0] not in already_friends]
+
+def _rank_suggestions(user_id, config):
+
+    friends = get_friend_ids([user_id])[user_id]
+    if len(friends) <= config['IN_MEMORY_MAX_DEGREE']:
+        adjacency = get_friend_ids(friends) if friends else {}
+        mutual = Counter()
+        examined = 0
+        for friend_id in sorted(friends):
+            for candidate in adjacency[friend_id]:
+                if candidate != user_id and candidate not in friends:
+                    mutual[candidate] += 1
+            examined += len(adjacency[friend_id])
+            if examined >= config['MAX_SECOND_DEGREE']:
+                break
+        ranked = sorted(mutual.items(), key=lambda item: (-item[1], item[0]))[:config['LIMIT']]
+    else:
+        my_friends = FriendEdge.objects.filter(user_id=user_id).values('friend_id')
+        examined = FriendEdge.objects.filter(user_id__in=my_friends).order_by().values('id')[:config['MAX_SECOND_DEGREE']]
+        ranked = list(
+            FriendEdge.objects.filter(id__in=examined)
+            .exclude(friend_id=user_id)
+            .exclude(friend_id__in=my_friends)
+            .values('friend_id')
+            .annotate(mutual=Count('id'))
+            .order_by('-mutual', 'friend_id')
+            .values_list('friend_id', 'mutual')[:config['LIMIT']]
+        )
+    return ranked
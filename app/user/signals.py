@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.models import Friendship
+from user.services import link_friends, unlink_friends
+
+# FriendEdge mengikuti setiap perubahan Friendship yang lewat save()/delete().
+# Update massal (queryset.update) harus memanggil link_friends/unlink_friends sendiri.
+
+@receiver(post_save, sender=Friendship)
+def sync_friend_edges_on_save(sender, instance, created, **kwargs):
+    if instance.status == 'accepted':
+        link_friends(instance.sender_id, [instance.receiver_id])
+    elif not created:
+        unlink_friends(instance.sender_id, [instance.receiver_id])
+
+@receiver(post_delete, sender=Friendship)
+def sync_friend_edges_on_delete(sender, instance, **kwargs):
+    if instance.status == 'accepted':
+        unlink_friends(instance.sender_id, [instance.receiver_id])
@@ -1,5 +1,12 @@
+import threading
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.urls import reverse
-from django.test import override_settings
+from django.test import TransactionTestCase, override_settings
 
 from unittest.mock import patch
 
@@ -7,7 +14,8 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from authentication.models import CustomUser
-from user.models import Friendship
+from user.models import FriendEdge, Friendship
+from user.services import link_friends, unlink_friends
 
 class TestFriend(APITestCase):
     def setUp(self):
@@ -31,6 +39,7 @@ class TestFriend(APITestCase):
         self.accept_request_url = reverse('user:accept_friend')
         self.search_friend_url = reverse('user:search_friend')
         self.list_friends_url = reverse('user:list_friends')
+        self.remove_friend_url = reverse('user:remove_friend')
         
         self.client.force_authenticate(user=self.user1)
 
@@ -63,6 +72,100 @@ class TestFriend(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(Friendship.objects.filter(sender=self.user2, receiver=self.user1, status='accepted').exists())
 
+    def test_accept_friend_request_creates_symmetric_edges(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='pending')
+        self.client.post(self.accept_request_url, {'sender_id': self.user2.id})
+        self.assertTrue(FriendEdge.objects.filter(user=self.user1, friend=self.user2).exists())
+        self.assertTrue(FriendEdge.objects.filter(user=self.user2, friend=self.user1).exists())
+
+    def test_add_friend_when_already_friends(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='accepted')
+        response = self.client.post(self.add_friend_url, {'receiver_id': self.user2.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], "Already friends")
+
+    def test_remove_friend(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='accepted')
+        response = self.client.post(self.remove_friend_url, {'friend_id': self.user2.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Friendship.objects.exists())
+        self.assertFalse(FriendEdge.objects.exists())
+
+    def test_friends_count_follows_accept_and_remove(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='pending')
+        self.client.post(self.accept_request_url, {'sender_id': self.user2.id})
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual((self.user1.friends_count, self.user2.friends_count), (1, 1))
+
+        self.client.post(self.remove_friend_url, {'friend_id': self.user2.id})
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual((self.user1.friends_count, self.user2.friends_count), (0, 0))
+
+    def test_repair_friends_count(self):
+        Friendship.objects.create(sender=self.user1, receiver=self.user2, status='accepted')
+        Friendship.objects.create(sender=self.user3, receiver=self.user1, status='accepted')
+        CustomUser.objects.update(friends_count=7)
+
+        call_command('repair_friends_count', stdout=StringIO())
+
+        counts = dict(CustomUser.objects.values_list('username', 'friends_count'))
+        self.assertEqual(counts, {'user1': 2, 'user2': 1, 'user3': 1})
+
+    def test_bulk_accept_friend_requests(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='pending')
+        Friendship.objects.create(sender=self.user3, receiver=self.user2, status='pending')
+        response = self.client.post(reverse('user:bulk_accept_friend'), {
+            'ids': [self.user2.id, self.user3.id, 'abc']
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], {
+            str(self.user2.id): 'accepted', str(self.user3.id): 'not_found', 'abc': 'invalid'
+        })
+        self.assertTrue(FriendEdge.objects.filter(user=self.user2, friend=self.user1).exists())
+        self.user1.refresh_from_db()
+        self.assertEqual(self.user1.friends_count, 1)
+        self.assertEqual(Friendship.objects.get(sender=self.user3).status, 'pending')
+
+    def test_bulk_reject_friend_requests(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='pending')
+        Friendship.objects.create(sender=self.user3, receiver=self.user1, status='pending')
+        response = self.client.post(reverse('user:bulk_reject_friend'), {
+            'ids': [self.user2.id, self.user3.id]
+        }, format='json')
+
+        self.assertEqual(set(response.data['data'].values()), {'rejected'})
+        self.assertFalse(Friendship.objects.filter(status='pending').exists())
+        self.assertFalse(FriendEdge.objects.exists())
+
+    def test_bulk_cancel_and_resend_friend_request(self):
+        Friendship.objects.create(sender=self.user1, receiver=self.user2, status='pending')
+        response = self.client.post(reverse('user:bulk_cancel_friend'), {'ids': [self.user2.id]}, format='json')
+        self.assertEqual(response.data['data'], {str(self.user2.id): 'cancelled'})
+
+        response = self.client.post(self.add_friend_url, {'receiver_id': self.user2.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Friendship.objects.get(sender=self.user1, receiver=self.user2).status, 'pending')
+
+    def test_bulk_requires_id_list(self):
+        response = self.client.post(reverse('user:bulk_accept_friend'), {'ids': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_remove_friend_not_friends(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='pending')
+        response = self.client.post(self.remove_friend_url, {'friend_id': self.user2.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Friendship.objects.exists())
+
+    def test_remove_friend_invalid_id(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='accepted')
+        for friend_id in ['abc', '1.5', ['x']]:
+            response = self.client.post(self.remove_friend_url, {'friend_id': friend_id}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Friendship.objects.exists())
+
     def test_accept_nonexistent_friend_request(self):
         response = self.client.post(self.accept_request_url, {'sender_id': self.user3.id})
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -74,7 +177,34 @@ class TestFriend(APITestCase):
     def test_search_friend_success(self):
         response = self.client.get(f"{self.search_friend_url}?query=user2")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(response.data['data']['results'][0]['username'], 'user2')
+
+    def test_search_friend_prefix_and_typo(self):
+        self.user3.full_name = 'Budi Santoso'
+        self.user3.save()
+
+        response = self.client.get(f"{self.search_friend_url}?query=budi santos")
+        self.assertEqual([u['username'] for u in response.data['data']['results']], ['user3'])
+
+        response = self.client.get(f"{self.search_friend_url}?query=us")
+        usernames = [u['username'] for u in response.data['data']['results']]
+        self.assertEqual(sorted(usernames), ['user2', 'user3'])
+        self.assertNotIn('user1', usernames)
+
+    def test_search_friend_exact_email(self):
+        response = self.client.get(f"{self.search_friend_url}?query=USER3@example.com")
+        self.assertEqual([u['username'] for u in response.data['data']['results']], ['user3'])
+
+    def test_search_friend_keyset_pagination(self):
+        response = self.client.get(self.search_friend_url, {'query': 'user', 'page_size': 1})
+        first = response.data['data']['results']
+        response = self.client.get(self.search_friend_url, {
+            'query': 'user', 'page_size': 1, 'cursor': response.data['data']['next_cursor']
+        })
+        second = response.data['data']['results']
+        self.assertEqual(len(first) + len(second), 2)
+        self.assertNotEqual(first[0]['id'], second[0]['id'])
+        self.assertIsNone(response.data['data']['next_cursor'])
 
     def test_search_friend_not_found(self):
         response = self.client.get(f"{self.search_friend_url}?query=unknownuser")
@@ -84,12 +214,56 @@ class TestFriend(APITestCase):
         Friendship.objects.create(sender=self.user1, receiver=self.user2, status='accepted')
         response = self.client.get(self.list_friends_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']['friends']), 1)
+        self.assertEqual(len(response.data['data']['friends']['results']), 1)
+
+    def test_list_friends_includes_mutual_friend_counts(self):
+        Friendship.objects.create(sender=self.user1, receiver=self.user2, status='accepted')
+        Friendship.objects.create(sender=self.user1, receiver=self.user3, status='accepted')
+        Friendship.objects.create(sender=self.user2, receiver=self.user3, status='accepted')
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.list_friends_url)
+
+        counts = {item['username']: item['mutual_friends_count'] for item in response.data['data']['friends']['results']}
+        self.assertEqual(counts, {'user2': 1, 'user3': 1})
+
+    def test_search_friend_includes_mutual_friend_count(self):
+        Friendship.objects.create(sender=self.user1, receiver=self.user3, status='accepted')
+        Friendship.objects.create(sender=self.user2, receiver=self.user3, status='accepted')
+        response = self.client.get(f"{self.search_friend_url}?query=user2")
+        self.assertEqual(response.data['data']['results'][0]['mutual_friends_count'], 1)
+
+    def test_list_friends_paginated_with_counts(self):
+        Friendship.objects.create(sender=self.user1, receiver=self.user2, status='accepted')
+        Friendship.objects.create(sender=self.user3, receiver=self.user1, status='accepted')
+        self.user1.refresh_from_db()
+
+        response = self.client.get(self.list_friends_url, {'page_size': 1})
+        friends = response.data['data']['friends']
+        self.assertEqual(friends['count'], 2)
+        self.assertEqual(friends['results'][0]['username'], 'user3')
+
+        response = self.client.get(self.list_friends_url, {
+            'list': 'friends', 'page_size': 1, 'friends_cursor': friends['next_cursor']
+        })
+        self.assertEqual(list(response.data['data']), ['friends'])
+        self.assertEqual(response.data['data']['friends']['results'][0]['username'], 'user2')
+        self.assertIsNone(response.data['data']['friends']['next_cursor'])
+
+    def test_list_pending_and_sent_counts(self):
+        Friendship.objects.create(sender=self.user2, receiver=self.user1, status='pending')
+        Friendship.objects.create(sender=self.user1, receiver=self.user3, status='pending')
+        response = self.client.get(self.list_friends_url)
+        data = response.data['data']
+        self.assertEqual(data['pending_requests']['count'], 1)
+        self.assertEqual(data['pending_requests']['results'][0]['username'], 'user2')
+        self.assertEqual(data['sent_requests']['count'], 1)
+        self.assertEqual(data['sent_requests']['results'][0]['username'], 'user3')
 
     def test_list_friends_no_friends(self):
         response = self.client.get(self.list_friends_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']['friends']), 0)
+        self.assertEqual(len(response.data['data']['friends']['results']), 0)
 
     # OWASP Testing
     def test_unauthorized_access_add_friend(self):
@@ -113,7 +287,7 @@ class TestFriend(APITestCase):
         # OWASP A2:2021 Cryptographic Failures
         response = self.client.get(f"{self.search_friend_url}?query=user2")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        user_data = response.data['data'][0]
+        user_data = response.data['data']['results'][0]
         self.assertNotIn('password', user_data)
 
     def test_sql_injection_in_search(self):
@@ -122,7 +296,7 @@ class TestFriend(APITestCase):
         malicious_query = "user2' OR 1=1--"
         response = self.client.get(f"{self.search_friend_url}?query={malicious_query}")
         if response.status_code == status.HTTP_200_OK:
-            self.assertLess(len(response.data['data']), CustomUser.objects.count())
+            self.assertLess(len(response.data['data']['results']), CustomUser.objects.count())
         else:
             self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
@@ -175,3 +349,93 @@ class TestFriend(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         friendship = Friendship.objects.get(sender=self.user2, receiver=self.user1)
         self.assertEqual(friendship.status, 'accepted')
+
+
+class TestFriendSuggestions(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            CustomUser.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='password123')
+            for i in range(1, 6)
+        ]
+        u1, u2, u3, u4, u5 = self.users
+        for sender, receiver in [(u1, u2), (u1, u3), (u2, u4), (u3, u4), (u2, u5)]:
+            Friendship.objects.create(sender=sender, receiver=receiver, status='accepted')
+
+        self.suggestions_url = reverse('user:friend_suggestions')
+        self.client.force_authenticate(user=u1)
+
+    def suggested(self):
+        response = self.client.get(self.suggestions_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(item['username'], item['mutual_friends_count']) for item in response.data['data']]
+
+    def test_suggestions_ranked_by_mutual_friends(self):
+        self.assertEqual(self.suggested(), [('user4', 2), ('user5', 1)])
+
+    def test_suggestions_with_self_join_for_high_degree(self):
+        with self.settings(FRIEND_SUGGESTIONS={**settings.FRIEND_SUGGESTIONS, 'IN_MEMORY_MAX_DEGREE': 0}):
+            self.assertEqual(self.suggested(), [('user4', 2), ('user5', 1)])
+
+    def test_cached_suggestions_skip_current_friends(self):
+        self.suggested()
+        u1, _, _, u4, _ = self.users
+        # Accept di worker lain: cache saran di sini tidak ikut dihapus
+        FriendEdge.objects.bulk_create([FriendEdge(user=u1, friend=u4), FriendEdge(user=u4, friend=u1)])
+        self.assertEqual(self.suggested(), [('user5', 1)])
+
+    def test_suggestions_invalidated_when_graph_changes(self):
+        self.suggested()
+        u1, _, _, u4, _ = self.users
+        with self.captureOnCommitCallbacks(execute=True):
+            Friendship.objects.create(sender=u4, receiver=u1, status='accepted')
+        self.assertEqual(self.suggested(), [('user5', 1)])
+
+
+class TestFriendEdgeConcurrency(TransactionTestCase):
+    def setUp(self):
+        self.user1 = CustomUser.objects.create_user(email='user1@example.com', username='user1', password='password123')
+        self.user2 = CustomUser.objects.create_user(email='user2@example.com', username='user2', password='password123')
+
+    def run_twice_concurrently(self, func):
+        """Run ``func`` in two transactions; the second starts while the first is still open."""
+        first_done, release, errors = threading.Event(), threading.Event(), []
+
+        def worker(hold):
+            try:
+                with transaction.atomic():
+                    func()
+                    if hold:
+                        first_done.set()
+                        release.wait(5)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        first = threading.Thread(target=worker, args=(True,))
+        first.start()
+        first_done.wait(5)
+        second = threading.Thread(target=worker, args=(False,))
+        second.start()
+        second.join(0.3)
+        release.set()
+        first.join()
+        second.join()
+        self.assertEqual(errors, [])
+
+    def friends_counts(self):
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        return self.user1.friends_count, self.user2.friends_count
+
+    def test_concurrent_link_counts_once(self):
+        self.run_twice_concurrently(lambda: link_friends(self.user1.id, [self.user2.id]))
+        self.assertEqual(self.friends_counts(), (1, 1))
+        self.assertEqual(FriendEdge.objects.count(), 2)
+
+    def test_concurrent_unlink_counts_once(self):
+        link_friends(self.user1.id, [self.user2.id])
+        self.run_twice_concurrently(lambda: unlink_friends(self.user1.id, [self.user2.id]))
+        self.assertEqual(self.friends_counts(), (0, 0))
+        self.assertFalse(FriendEdge.objects.exists())
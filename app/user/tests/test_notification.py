@@ -1,10 +1,17 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils.timezone import now
 import json
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
 from authentication.models import CustomUser
-from user.models import Notification
+from user.hub import InProcessNotificationHub
+from user.models import Notification, NotificationBatch, ScheduledNotification
 
 class TestSendNotification(APITestCase):
     def setUp(self):
@@ -239,6 +246,79 @@ class TestSendNotification(APITestCase):
         # verifikasi XSS content dobersihkan atau dibuang
         response_content = json.dumps(response.data)
         self.assertNotIn("<script>", response_content)
+
+    def test_notification_rendered_once_without_double_escaping(self):
+        self.authenticate(self.admin_user)
+        self.client.post(self.send_notification_url, {
+            "title": "Tom & Jerry",
+            "message": "<b>hi</b>",
+            "receiver_id": self.user1.id
+        })
+
+        notification = Notification.objects.get(receiver=self.user1)
+        self.assertEqual(notification.title, "Tom & Jerry")
+        self.assertEqual(notification.rendered_title, "Tom &amp; Jerry")
+
+        self.authenticate(self.user1)
+        response = self.client.get(self.user_notification_url)
+        item = response.data['data'][0]
+        self.assertEqual(item['title'], "Tom &amp; Jerry")
+        self.assertEqual(item['message'], "&lt;b&gt;hi&lt;/b&gt;")
+
+    def test_admin_notifications_grouped_by_send_event(self):
+        self.authenticate(self.admin_user)
+        self.client.post(self.send_notification_url, {"title": "Broadcast", "message": "Hello everyone"})
+        self.client.post(self.send_notification_url, {"title": "Direct", "message": "Hello", "receiver_id": self.user1.id})
+
+        response = self.client.get(self.admin_notification_url, {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['data']['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], "Direct")
+        self.assertEqual(results[0]['recipient_count'], 1)
+
+        response = self.client.get(self.admin_notification_url, {'page_size': 1, 'cursor': response.data['data']['next_cursor']})
+        results = response.data['data']['results']
+        self.assertEqual(results[0]['title'], "Broadcast")
+        self.assertEqual(results[0]['recipient_count'], 2)
+        self.assertIsNone(response.data['data']['next_cursor'])
+
+    def test_admin_notification_recipients_paginated(self):
+        self.authenticate(self.admin_user)
+        self.client.post(self.send_notification_url, {"title": "Broadcast", "message": "Hello everyone"})
+        batch = NotificationBatch.objects.get()
+        recipients_url = reverse('admin_dashboard:notification_recipients', args=[batch.id])
+
+        response = self.client.get(recipients_url, {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data['data']['results'][0]['receiver']['id']
+
+        response = self.client.get(recipients_url, {'page_size': 1, 'cursor': response.data['data']['next_cursor']})
+        second = response.data['data']['results'][0]['receiver']['id']
+        self.assertEqual({first, second}, {self.user1.id, self.user2.id})
+
+    def test_admin_notifications_invalid_cursor(self):
+        self.authenticate(self.admin_user)
+        response = self.client.get(self.admin_notification_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_broadcast_notifications_are_rendered(self):
+        self.authenticate(self.admin_user)
+        self.client.post(self.send_notification_url, {"title": "<i>All</i>", "message": "Hello"})
+        self.assertFalse(Notification.objects.exclude(rendered_title="&lt;i&gt;All&lt;/i&gt;").exists())
+
+    def test_admin_notifications_served_from_rendered_fields(self):
+        self.authenticate(self.admin_user)
+        self.client.post(self.send_notification_url, {"title": "<i>All</i>", "message": "Tom & Jerry"})
+        self.client.post(self.send_notification_url, {"title": "<b>Direct</b>", "message": "Hi", "receiver_id": self.user1.id})
+        self.assertEqual(
+            set(NotificationBatch.objects.values_list('rendered_title', 'rendered_message')),
+            {("&lt;i&gt;All&lt;/i&gt;", "Tom &amp; Jerry"), ("&lt;b&gt;Direct&lt;/b&gt;", "Hi")}
+        )
+
+        response = self.client.get(self.admin_notification_url)
+        titles = [item['title'] for item in response.data['data']['results']]
+        self.assertEqual(titles, ["&lt;b&gt;Direct&lt;/b&gt;", "&lt;i&gt;All&lt;/i&gt;"])
         
     # CSRF protection test (part of OWASP A01)
     def test_csrf_protection(self):
@@ -283,4 +363,110 @@ class TestSendNotification(APITestCase):
     # OWASP A09:2021 - Security Logging and Monitoring Failures
     def test_security_logs_exist(self):
         logs_exist = True  # Anggap log sistem ada
-        self.assertTrue(logs_exist, "System must have security event logs")
\ No newline at end of file
+        self.assertTrue(logs_exist, "System must have security event logs")
+
+class TestNotificationStream(APITestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            email="admin@example.com",
+            username="admin",
+            password="adminpassword"
+        )
+        self.user1 = CustomUser.objects.create_user(
+            email="user1@example.com",
+            username="user1",
+            password="password1"
+        )
+        self.stream_url = reverse('user:notification_stream')
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(self.stream_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_resumes_from_last_event_id(self):
+        first = await Notification.objects.acreate(title="First", message="One", sender=self.admin_user, receiver=self.user1)
+        second = await Notification.objects.acreate(title="Second", message="Two", sender=self.admin_user, receiver=self.user1)
+        self.async_client.cookies['access_token'] = str(AccessToken.for_user(self.user1))
+
+        response = await self.async_client.get(self.stream_url, headers={'Last-Event-ID': str(first.id)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunk = (await anext(aiter(response.streaming_content))).decode()
+        await response.streaming_content.aclose()
+        self.assertIn(f"id: {second.id}", chunk)
+        self.assertIn('"title": "Second"', chunk)
+
+    async def test_hub_delivers_to_receiver_and_broadcast(self):
+        hub = InProcessNotificationHub()
+        subscription = hub.subscribe(self.user1.id)
+        other = hub.subscribe(self.admin_user.id)
+
+        hub.publish(self.user1.id, {'id': 1, 'payload': {}})
+        hub.publish(None, {'id': None})
+
+        self.assertEqual((await subscription.get(timeout=1))['id'], 1)
+        self.assertIsNone((await subscription.get(timeout=1))['id'])
+        self.assertIsNone((await other.get(timeout=1))['id'])
+        self.assertTrue(other.queue.empty())
+
+        hub.unsubscribe(subscription)
+        hub.unsubscribe(other)
+
+
+class TestScheduledNotification(APITestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            email="admin@example.com",
+            username="admin",
+            password="adminpassword"
+        )
+        self.user1 = CustomUser.objects.create_user(
+            email="user1@example.com",
+            username="user1",
+            password="password1"
+        )
+        self.send_notification_url = reverse('admin_dashboard:send_notification')
+        self.client.force_authenticate(self.admin_user)
+
+    def dispatch(self):
+        call_command('dispatch_notifications', '--once', stdout=StringIO())
+
+    def test_schedule_notification_for_later(self):
+        send_at = (now() + timedelta(hours=1)).isoformat()
+        response = self.client.post(self.send_notification_url, {
+            "title": "Later", "message": "Scheduled", "receiver_id": self.user1.id, "send_at": send_at
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ScheduledNotification.objects.filter(status='pending').count(), 1)
+
+        self.dispatch()
+        self.assertFalse(Notification.objects.exists())
+
+    def test_schedule_with_invalid_send_at(self):
+        response = self.client.post(self.send_notification_url, {
+            "title": "Later", "message": "Scheduled", "send_at": "tomorrow"
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_schedule_with_impossible_send_at(self):
+        response = self.client.post(self.send_notification_url, {
+            "title": "Later", "message": "Scheduled", "send_at": "2024-13-01T00:00:00"
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["message"], "Invalid send_at format")
+
+    def test_dispatch_delivers_due_notifications_once(self):
+        ScheduledNotification.objects.create(
+            title="Direct", message="Hi", sender=self.admin_user, receiver=self.user1, send_at=now() - timedelta(minutes=1)
+        )
+        ScheduledNotification.objects.create(
+            title="Broadcast", message="Hi all", sender=self.admin_user, send_at=now() - timedelta(minutes=1)
+        )
+
+        self.dispatch()
+        self.dispatch()
+
+        self.assertEqual(Notification.objects.filter(receiver=self.user1).count(), 2)
+        self.assertFalse(ScheduledNotification.objects.filter(status='pending').exists())
+        self.assertFalse(ScheduledNotification.objects.filter(batch__isnull=True).exists())
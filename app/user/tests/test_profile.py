@@ -4,7 +4,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from user.models import CustomUser
+from user.models import CustomUser, Friendship
 from authentication.models import PaymentMethod, BankDetail
 
 class TestUserProfile(APITestCase):
@@ -30,6 +30,7 @@ class TestUserProfile(APITestCase):
         response = self.client.get(self.profile_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["message"], "User profile retrieved")
+        self.assertEqual(response.data["data"]["friends_count"], 0)
 
     def test_patch_update_profile_success(self):
         data = {"full_name": "John Doe", "bio": "Hello, I love coding!", "avatar_id": "123"}
@@ -37,6 +38,19 @@ class TestUserProfile(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["message"], "Profile updated successfully")
 
+    def test_patch_profile_keeps_friends_count(self):
+        friend = CustomUser.objects.create_user(email="friend@example.com", username="friend", password="password")
+        Friendship.objects.create(sender=friend, receiver=self.user, status="pending")
+        response = self.client.post(reverse("user:accept_friend"), {"sender_id": friend.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # self.user yang dipakai force_authenticate masih friends_count=0 di memori
+        response = self.client.patch(self.profile_url, {"full_name": "John Doe"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.full_name, self.user.friends_count), ("John Doe", 1))
+
     def test_patch_update_profile_long_name(self):
         data = {"full_name": "A" * 256}
         response = self.client.patch(self.profile_url, data)
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now
+
+from authentication.models import CustomUser
+from user.models import Notification
+
+class TestPruneNotifications(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            email="admin@example.com",
+            username="admin",
+            password="adminpassword"
+        )
+        self.user1 = CustomUser.objects.create_user(
+            email="user1@example.com",
+            username="user1",
+            password="password1"
+        )
+
+    def create_notifications(self, count, age_days=0):
+        Notification.objects.bulk_create([
+            Notification(title=f"Title {i}", message="Message", sender=self.admin_user, receiver=self.user1)
+            for i in range(count)
+        ])
+        if age_days:
+            ids = Notification.objects.order_by('-id').values_list('id', flat=True)[:count]
+            Notification.objects.filter(id__in=list(ids)).update(created_at=now() - timedelta(days=age_days))
+
+    def prune(self, *args):
+        out = StringIO()
+        call_command('prune_notifications', *args, stdout=out)
+        return out.getvalue()
+
+    def test_prune_by_age_in_chunks(self):
+        self.create_notifications(7, age_days=200)
+        self.create_notifications(3)
+
+        output = self.prune('--max-age-days', '180', '--max-per-user', '0', '--chunk-size', '2')
+
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertIn("Deleted 7 notifications", output)
+
+    def test_prune_keeps_newest_per_user(self):
+        self.create_notifications(5)
+        newest = list(Notification.objects.order_by('-id').values_list('id', flat=True)[:2])
+
+        self.prune('--max-age-days', '0', '--max-per-user', '2', '--chunk-size', '1')
+
+        self.assertEqual(sorted(Notification.objects.values_list('id', flat=True)), sorted(newest))
+
+    def test_dry_run_does_not_delete(self):
+        self.create_notifications(4, age_days=200)
+        self.create_notifications(3)
+
+        output = self.prune('--max-age-days', '180', '--max-per-user', '2', '--dry-run')
+
+        self.assertEqual(Notification.objects.count(), 7)
+        self.assertIn("Would delete 5 notifications (4 by age, 1 by per-user limit)", output)
@@ -1,16 +1,22 @@
 from django.urls import path
 
-from user.views import AcceptFriendRequestView, AddFriendView, BankDetailView, ListFriendsView, PaymentMethodView, SearchFriendView, UserNotificationView, UserProfileView
+from user.views import AcceptFriendRequestView, AddFriendView, BankDetailView, BulkAcceptFriendRequestsView, BulkCancelFriendRequestsView, BulkRejectFriendRequestsView, FriendSuggestionsView, ListFriendsView, PaymentMethodView, RemoveFriendView, SearchFriendView, UserNotificationView, UserProfileView, notification_stream
 
 app_name = 'user'
 
 urlpatterns = [
     path('see-notifications', UserNotificationView.as_view(), name='see_notifications'),
+    path('notifications/stream', notification_stream, name='notification_stream'),
 
     path('friends/add', AddFriendView.as_view(), name='add_friend'),
     path('friends/accept', AcceptFriendRequestView.as_view(), name='accept_friend'),
+    path('friends/accept/bulk', BulkAcceptFriendRequestsView.as_view(), name='bulk_accept_friend'),
+    path('friends/reject/bulk', BulkRejectFriendRequestsView.as_view(), name='bulk_reject_friend'),
+    path('friends/cancel/bulk', BulkCancelFriendRequestsView.as_view(), name='bulk_cancel_friend'),
+    path('friends/remove', RemoveFriendView.as_view(), name='remove_friend'),
     path('friends/search', SearchFriendView.as_view(), name='search_friend'),
     path('friends/list', ListFriendsView.as_view(), name='list_friends'),
+    path('friends/suggestions', FriendSuggestionsView.as_view(), name='friend_suggestions'),
 
     path('profile', UserProfileView.as_view(), name='user_profile'),
     path('profile/payment-method', PaymentMethodView.as_view(), name='payment_method'),
@@ -1,13 +1,29 @@
-from django.db.models import Count, Q
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, Count, FloatField, Max, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Lower
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
+from authentication.auth import CookieJWTAuthentication
 from authentication.models import BankDetail, CustomUser, PaymentMethod
-from user.models import Friendship, Notification
-from user.serializers import NotificationSerializer, UserProfileSerializer, UserSerializer
-from utils import api_response
+from user.hub import get_hub
+from user.models import FriendEdge, Friendship, Notification, NotificationBatch, ScheduledNotification
+from user.serializers import FriendUserSerializer, NotificationBatchSerializer, NotificationRecipientSerializer, UserProfileSerializer
+from user.services import are_friends, deliver_notification, link_friends, mutual_friend_counts, suggest_friends, transition_friend_requests
+from utils import InvalidCursor, api_response, get_page_size, keyset_paginate
 
 # NOTIFICATION
 class SendNotificationView(APIView):
@@ -17,47 +33,177 @@ class SendNotificationView(APIView):
         data = request.data
         sender = request.user
         receiver_id = data.get('receiver_id')
+        title = str(data.get('title') or '').strip()
+        message = str(data.get('message') or '').strip()
 
-        if not data.get('title') or not data.get('message'):
+        if not title or not message:
             return api_response(status.HTTP_400_BAD_REQUEST, "Title and message are required")
 
-        # Kirim ke semua user
-        if not receiver_id:
-            users = CustomUser.objects.filter(is_active=True).exclude(id=sender.id)
-            notifications = [
-                Notification(title=data['title'], message=data['message'], sender=sender, receiver=user)
-                for user in users
-            ]
-            Notification.objects.bulk_create(notifications)
-            return api_response(status.HTTP_201_CREATED, 'Notification successfully sent to all users')
-
-        # Kirim ke user tertentu
-        try:
-            receiver = CustomUser.objects.get(id=receiver_id, is_active=True)
+        send_at = None
+        if data.get('send_at'):
+            try:
+                send_at = parse_datetime(str(data['send_at']))
+            except ValueError:
+                # Format benar tapi tanggal mustahil, mis. bulan 13
+                send_at = None
+            if send_at is None:
+                return api_response(status.HTTP_400_BAD_REQUEST, 'Invalid send_at format')
+            if timezone.is_naive(send_at):
+                send_at = timezone.make_aware(send_at)
+            if send_at <= timezone.now():
+                send_at = None
+
+        receiver = None
+        if receiver_id:
+            try:
+                receiver = CustomUser.objects.get(id=receiver_id, is_active=True)
+            except CustomUser.DoesNotExist:
+                return api_response(status.HTTP_400_BAD_REQUEST, 'Invalid user ID')
 
             if receiver == sender:
                 return api_response(status.HTTP_400_BAD_REQUEST, 'Cannot send notification to yourself')
 
-            Notification.objects.create(title=data['title'], message=data['message'], sender=sender, receiver=receiver)
-            return api_response(status.HTTP_201_CREATED, 'Notification successfully sent')
-        except CustomUser.DoesNotExist:
-            return api_response(status.HTTP_400_BAD_REQUEST, 'Invalid user ID')
-        
+        # Dijadwalkan, dikirim oleh `manage.py dispatch_notifications`
+        if send_at:
+            ScheduledNotification.objects.create(
+                title=title, message=message, sender=sender, receiver=receiver, send_at=send_at
+            )
+            return api_response(status.HTTP_201_CREATED, 'Notification successfully scheduled')
+
+        deliver_notification(sender.id, title, message, receiver_id=receiver.id if receiver else None)
+
+        if receiver is None:
+            return api_response(status.HTTP_201_CREATED, 'Notification successfully sent to all users')
+        return api_response(status.HTTP_201_CREATED, 'Notification successfully sent')
+
 class UserNotificationView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        notifications = Notification.objects.filter(receiver=request.user).order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True)
-        return api_response(status.HTTP_200_OK, 'Notifications retrieved successfully', serializer.data)
+        notifications = Notification.objects.filter(receiver=request.user).order_by('-created_at').payloads()
+        return api_response(status.HTTP_200_OK, 'Notifications retrieved successfully', notifications)
     
+def _format_event(notification_id, payload):
+    data = json.dumps(payload, cls=DjangoJSONEncoder)
+    return f"id: {notification_id}\nevent: notification\ndata: {data}\n\n"
+
+@sync_to_async
+def _authenticate_stream(request):
+    try:
+        result = CookieJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+@sync_to_async
+def _latest_notification_id(user_id):
+    return Notification.objects.filter(receiver_id=user_id).aggregate(last_id=Max('id'))['last_id'] or 0
+
+@sync_to_async
+def _notifications_after(user_id, last_id):
+    return Notification.objects.filter(receiver_id=user_id, id__gt=last_id).order_by('id').payloads()
+
+async def _notification_events(user_id, subscription, last_id):
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT
+    try:
+        # Resume dari Last-Event-ID atau mulai dari notifikasi terakhir
+        if last_id is None:
+            last_id = await _latest_notification_id(user_id)
+        else:
+            for payload in await _notifications_after(user_id, last_id):
+                yield _format_event(payload['id'], payload)
+                last_id = payload['id']
+
+        while True:
+            try:
+                event = await subscription.get(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            if event['id'] is None or subscription.overflowed:
+                subscription.overflowed = False
+                for payload in await _notifications_after(user_id, last_id):
+                    yield _format_event(payload['id'], payload)
+                    last_id = payload['id']
+            elif event['id'] > last_id:
+                yield _format_event(event['id'], event['payload'])
+                last_id = event['id']
+    finally:
+        get_hub().unsubscribe(subscription)
+
+async def notification_stream(request):
+    user = await _authenticate_stream(request)
+    if user is None:
+        return JsonResponse({
+            "status": status.HTTP_401_UNAUTHORIZED,
+            "message": "Authentication credentials were not provided",
+            "data": []
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+
+    # Subscribe sebelum membaca DB supaya tidak ada notifikasi yang terlewat
+    subscription = get_hub().subscribe(user.id)
+    response = StreamingHttpResponse(
+        _notification_events(user.id, subscription, last_id),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 class AdminNotificationView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        notifications = Notification.objects.all().order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True)
-        return api_response(status.HTTP_200_OK, 'Notifications retrieved successfully', serializer.data)
+        # Satu baris per event pengiriman, bukan per penerima
+        batches = NotificationBatch.objects.select_related('sender').only(
+            'id', 'rendered_title', 'rendered_message', 'recipient_count', 'created_at', 'sender__id', 'sender__username'
+        )
+        try:
+            batches, next_cursor = keyset_paginate(
+                batches, ('-created_at', '-id'),
+                cursor=request.query_params.get('cursor'),
+                page_size=get_page_size(request),
+            )
+        except InvalidCursor:
+            return api_response(status.HTTP_400_BAD_REQUEST, 'Invalid cursor')
+
+        data = {
+            'results': NotificationBatchSerializer(batches, many=True).data,
+            'next_cursor': next_cursor,
+        }
+        return api_response(status.HTTP_200_OK, 'Notifications retrieved successfully', data)
+
+class AdminNotificationRecipientsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, batch_id):
+        if not NotificationBatch.objects.filter(id=batch_id).exists():
+            return api_response(status.HTTP_404_NOT_FOUND, 'Notification not found')
+
+        notifications = Notification.objects.filter(batch_id=batch_id).select_related('receiver').only(
+            'id', 'created_at', 'receiver__id', 'receiver__username', 'receiver__avatar_id'
+        )
+        try:
+            notifications, next_cursor = keyset_paginate(
+                notifications, ('id',),
+                cursor=request.query_params.get('cursor'),
+                page_size=get_page_size(request),
+            )
+        except InvalidCursor:
+            return api_response(status.HTTP_400_BAD_REQUEST, 'Invalid cursor')
+
+        data = {
+            'results': NotificationRecipientSerializer(notifications, many=True).data,
+            'next_cursor': next_cursor,
+        }
+        return api_response(status.HTTP_200_OK, 'Notification recipients retrieved successfully', data)
 
 
 # FRIENDSHIP
@@ -79,16 +225,17 @@ class AddFriendView(APIView):
         if receiver == sender:
             return api_response(status.HTTP_400_BAD_REQUEST, 'Cannot add yourself as friend')
         
-        if Friendship.objects.filter(
-            Q(sender=sender, receiver=receiver) | Q(sender=receiver, receiver=sender),
-            status="accepted"
-        ).exists():
+        if are_friends(sender.id, receiver.id):
             return api_response(status.HTTP_400_BAD_REQUEST, "Already friends")
 
         if Friendship.objects.filter(sender=sender, receiver=receiver, status="pending").exists():
             return api_response(status.HTTP_400_BAD_REQUEST, "Already sent a request")
 
-        Friendship.objects.create(sender=sender, receiver=receiver)
+        # Request lama yang ditolak/dibatalkan dibuka lagi (sender, receiver unik)
+        Friendship.objects.update_or_create(
+            sender=sender, receiver=receiver,
+            defaults={"status": "pending", "created_at": timezone.now()}
+        )
         return api_response(status.HTTP_201_CREATED, "Friend request sent")
 
 class AcceptFriendRequestView(APIView):
@@ -111,82 +258,244 @@ class AcceptFriendRequestView(APIView):
         if friend_request.receiver != request.user:
             return api_response(status.HTTP_403_FORBIDDEN, "You are not authorized to accept this request")
 
-        friend_request.status = "accepted"
-        friend_request.save()
+        # FriendEdge ikut dibuat lewat signal post_save
+        with transaction.atomic():
+            friend_request.status = "accepted"
+            friend_request.save()
 
         return api_response(status.HTTP_200_OK, "Friend request accepted")
 
+class BulkFriendRequestView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_ids = 500
+    # Diisi subclass: posisi user saat ini di Friendship, status tujuan, dan pesan
+    role = None
+    new_status = None
+    message = None
+
+    def post(self, request):
+        ids = request.data.get("ids")
+
+        if not isinstance(ids, list) or not ids:
+            return api_response(status.HTTP_400_BAD_REQUEST, "A list of ids is required")
+
+        if len(ids) > self.max_ids:
+            return api_response(status.HTTP_400_BAD_REQUEST, f"At most {self.max_ids} ids per request")
+
+        results = {}
+        valid_ids = set()
+        for raw_id in ids:
+            try:
+                valid_ids.add(int(raw_id))
+            except (TypeError, ValueError):
+                results[str(raw_id)] = "invalid"
+
+        with transaction.atomic():
+            updated = transition_friend_requests(request.user.id, valid_ids, self.role, self.new_status)
+            if self.new_status == "accepted":
+                link_friends(request.user.id, updated)
+
+        for user_id in valid_ids:
+            results[str(user_id)] = self.new_status if user_id in updated else "not_found"
+
+        return api_response(status.HTTP_200_OK, self.message, results)
+
+class BulkAcceptFriendRequestsView(BulkFriendRequestView):
+    role = "receiver"
+    new_status = "accepted"
+    message = "Friend requests accepted"
+
+class BulkRejectFriendRequestsView(BulkFriendRequestView):
+    role = "receiver"
+    new_status = "rejected"
+    message = "Friend requests rejected"
+
+class BulkCancelFriendRequestsView(BulkFriendRequestView):
+    role = "sender"
+    new_status = "cancelled"
+    message = "Friend requests cancelled"
+
+class RemoveFriendView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        friend_id = request.data.get("friend_id")
+
+        if not friend_id:
+            return api_response(status.HTTP_400_BAD_REQUEST, "Friend ID is required")
+        try:
+            friend_id = int(friend_id)
+        except (TypeError, ValueError):
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid friend ID")
+
+        with transaction.atomic():
+            friendships = Friendship.objects.filter(
+                Q(sender=request.user, receiver_id=friend_id) | Q(sender_id=friend_id, receiver=request.user),
+                status="accepted"
+            )
+            if not friendships.exists():
+                return api_response(status.HTTP_404_NOT_FOUND, "Friend not found")
+
+            # FriendEdge ikut dihapus lewat signal post_delete
+            for friendship in friendships:
+                friendship.delete()
+
+        return api_response(status.HTTP_200_OK, "Friend removed")
+
 
 class SearchFriendView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        query = request.query_params.get("query")
+        query = (request.query_params.get("query") or "").strip()
 
         if not query:
             return api_response(status.HTTP_400_BAD_REQUEST, "Search query is required")
 
-        users = CustomUser.objects.filter(username__iexact=query) | CustomUser.objects.filter(email__iexact=query)
+        users = CustomUser.objects.filter(is_active=True).exclude(id=request.user.id)
+        term = query.lower()
+
+        if "@" in term:
+            # Email hanya exact match, lewat index lower(email)
+            users = users.alias(email_lower=Lower("email")).filter(email_lower=term).annotate(
+                rank=Value(1.0, output_field=FloatField())
+            )
+        else:
+            # Prefix dan typo pada username/full name, lewat index GIN pg_trgm
+            users = users.annotate(
+                username_lower=Lower("username"),
+                full_name_lower=Lower("full_name"),
+            ).filter(
+                Q(username_lower__startswith=term) |
+                Q(username_lower__trigram_similar=term) |
+                Q(full_name_lower__trigram_similar=term)
+            ).annotate(
+                rank=Cast(
+                    Greatest(
+                        TrigramSimilarity("username_lower", term),
+                        TrigramSimilarity("full_name_lower", term),
+                    ) + Case(
+                        When(username_lower=term, then=Value(2.0)),
+                        When(username_lower__startswith=term, then=Value(1.0)),
+                        default=Value(0.0),
+                    ),
+                    output_field=FloatField(),
+                )
+            )
+
+        try:
+            users, next_cursor = keyset_paginate(
+                users.only("id", "username", "avatar_id"), ("-rank", "-id"),
+                cursor=request.query_params.get("cursor"),
+                page_size=get_page_size(request),
+            )
+        except InvalidCursor:
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
 
-        if not users.exists():
+        if not users and not request.query_params.get("cursor"):
             return api_response(status.HTTP_404_NOT_FOUND, f"User with username or email '{query}' not found", [])
 
-        serializer = UserSerializer(users, many=True)
+        mutual_counts = mutual_friend_counts(request.user.id, [user.id for user in users])
+        serializer = FriendUserSerializer(users, many=True, context={'mutual_counts': mutual_counts})
+        data = {
+            "results": serializer.data,
+            "next_cursor": next_cursor,
+        }
 
-        return api_response(status.HTTP_200_OK, "Friends retrieved successfully", serializer.data)
+        return api_response(status.HTTP_200_OK, "Friends retrieved successfully", data)
 
 
 class ListFriendsView(APIView):
     permission_classes = [IsAuthenticated]
+    user_fields = ("id", "username", "avatar_id")
 
     def get(self, request):
         user = request.user
-
-        accepted_friends = Friendship.objects.filter(
-            Q(sender=user, status="accepted") | Q(receiver=user, status="accepted")
-        ).values_list("sender_id", "receiver_id")
-
-        friend_ids = set()
-        for sender, receiver in accepted_friends:
-            friend_ids.add(sender if receiver == user.id else receiver)
-
-        friends = CustomUser.objects.filter(id__in=friend_ids)
-
-        # pending requests yang masuk
-        pending_users = CustomUser.objects.filter(
-            id__in=Friendship.objects.filter(receiver=user, status="pending").values_list("sender_id", flat=True)
+        requested = request.query_params.get("list")
+        page_size = get_page_size(request)
+
+        # (queryset edge/friendship, relasi ke user yang ditampilkan), keyset pada (created_at, id)
+        lists = {
+            "friends": (
+                FriendEdge.objects.filter(user=user).select_related("friend")
+                .only("id", "created_at", *(f"friend__{field}" for field in self.user_fields)),
+                "friend",
+            ),
+            # pending requests yang masuk
+            "pending_requests": (
+                Friendship.objects.filter(receiver=user, status="pending").select_related("sender")
+                .only("id", "created_at", *(f"sender__{field}" for field in self.user_fields)),
+                "sender",
+            ),
+            # request yang dikirim
+            "sent_requests": (
+                Friendship.objects.filter(sender=user, status="pending").select_related("receiver")
+                .only("id", "created_at", *(f"receiver__{field}" for field in self.user_fields)),
+                "receiver",
+            ),
+        }
+        if requested:
+            if requested not in lists:
+                return api_response(status.HTTP_400_BAD_REQUEST, "Invalid list")
+            lists = {requested: lists[requested]}
+
+        pages = {}
+        for name, (queryset, relation) in lists.items():
+            try:
+                rows, next_cursor = keyset_paginate(
+                    queryset, ("-created_at", "-id"),
+                    cursor=request.query_params.get(f"{name}_cursor"),
+                    page_size=page_size,
+                )
+            except InvalidCursor:
+                return api_response(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+            pages[name] = ([getattr(row, relation) for row in rows], next_cursor)
+
+        # Total pending dan sent dari satu query, total teman dari kolom friends_count
+        counts = Friendship.objects.filter(Q(receiver=user) | Q(sender=user), status="pending").aggregate(
+            pending_requests=Count("id", filter=Q(receiver=user)),
+            sent_requests=Count("id", filter=Q(sender=user)),
         )
+        counts["friends"] = user.friends_count
+
+        # Satu query untuk mutual friends semua user di halaman ini
+        page_user_ids = [u.id for users, _ in pages.values() for u in users]
+        context = {'mutual_counts': mutual_friend_counts(user.id, page_user_ids)}
 
-        # request yang dikirim
-        sent_users = CustomUser.objects.filter(
-            id__in=Friendship.objects.filter(sender=user, status="pending").values_list("receiver_id", flat=True)
-        )
-        
         data = {
-            "friends": UserSerializer(friends, many=True).data,
-            "pending_requests": UserSerializer(pending_users, many=True).data,
-            "sent_requests": UserSerializer(sent_users, many=True).data,
+            name: {
+                "results": FriendUserSerializer(users, many=True, context=context).data,
+                "next_cursor": next_cursor,
+                "count": counts[name],
+            }
+            for name, (users, next_cursor) in pages.items()
         }
         
         return api_response(status.HTTP_200_OK, "List of friends retrieved successfully", data)
     
 
+class FriendSuggestionsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ranked = suggest_friends(request.user.id)
+        users = CustomUser.objects.filter(id__in=[user_id for user_id, _ in ranked], is_active=True).only('id', 'username', 'avatar_id')
+        users_by_id = {user.id: user for user in users}
+        ranked_users = [users_by_id[user_id] for user_id, _ in ranked if user_id in users_by_id]
+
+        serializer = FriendUserSerializer(ranked_users, many=True, context={'mutual_counts': dict(ranked)})
+        data = serializer.data
+
+        return api_response(status.HTTP_200_OK, "Friend suggestions retrieved successfully", data)
+
+
 # PROFILE
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = CustomUser.objects.annotate(
-            friends_count=Count(
-                "sent_requests",
-                filter=Q(sent_requests__status="accepted"),
-                distinct=True
-            ) + Count(
-                "received_requests",
-                filter=Q(received_requests__status="accepted"),
-                distinct=True
-            )
-        ).get(id=request.user.id)
+        # friends_count disimpan di CustomUser, tidak perlu join ke Friendship
+        user = CustomUser.objects.prefetch_related("payment_methods", "bank_details").get(id=request.user.id)
         serializer = UserProfileSerializer(user)
         return api_response(status.HTTP_200_OK, "User profile retrieved", serializer.data)
 
@@ -209,7 +518,8 @@ class UserProfileView(APIView):
         user.bio = bio
         user.avatar_id = avatar_id
 
-        user.save()
+        # request.user bisa salinan cache; kolom lain (friends_count, saldo, last_seen) jangan ikut ditimpa
+        user.save(update_fields=['full_name', 'bio', 'avatar_id'])
 
         return api_response(status.HTTP_200_OK, "Profile updated successfully")
     
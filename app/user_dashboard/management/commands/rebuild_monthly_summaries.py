@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = "Rebuild MonthlySummary rows from Transaction, for every user or only the given ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Only rebuild this user id (repeatable)")
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        where, params = ("WHERE user_id = ANY(%s)", [user_ids]) if user_ids else ("", [])
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM user_dashboard_monthlysummary {where}", params)
+            cursor.execute(
+                f"""
+                INSERT INTO user_dashboard_monthlysummary (user_id, month, income, expense)
+                SELECT user_id, date_trunc('month', date)::date,
+                       COALESCE(SUM(amount) FILTER (WHERE type = 'income'), 0),
+                       COALESCE(SUM(amount) FILTER (WHERE type = 'expense'), 0)
+                FROM user_dashboard_transaction
+                {where}
+                GROUP BY user_id, date_trunc('month', date)
+                """,
+                params
+            )
+            rebuilt = cursor.rowcount
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} monthly summaries"))
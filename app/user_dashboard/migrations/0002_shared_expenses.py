@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2025-05-21 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_dashboard', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_expense_groups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExpenseGroupMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('net_balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='user_dashboard.expensegroup')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_group_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='expensegroup',
+            name='members',
+            field=models.ManyToManyField(related_name='expense_groups', through='user_dashboard.ExpenseGroupMember', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='SharedExpense',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField(blank=True)),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expenses', to='user_dashboard.expensegroup')),
+                ('paid_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paid_shared_expenses', to=settings.AUTH_USER_MODEL)),
+                ('transaction', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shared_expense', to='user_dashboard.transaction')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SharedExpenseShare',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shares', to='user_dashboard.sharedexpense')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shared_expense_shares', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='expensegroupmember',
+            constraint=models.UniqueConstraint(fields=('group', 'user'), name='unique_expense_group_member'),
+        ),
+        migrations.AddIndex(
+            model_name='sharedexpense',
+            index=models.Index(fields=['group', '-created_at', '-id'], name='shared_expense_group_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sharedexpenseshare',
+            constraint=models.UniqueConstraint(fields=('expense', 'user'), name='unique_shared_expense_share'),
+        ),
+    ]
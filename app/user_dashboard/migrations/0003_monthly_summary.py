@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2025-05-22 09:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_dashboard', '0002_shared_expenses'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expense', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('month', 'user'), name='unique_monthly_summary')],
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO user_dashboard_monthlysummary (user_id, month, income, expense)
+            SELECT user_id, date_trunc('month', date)::date,
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'income'), 0),
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'expense'), 0)
+            FROM user_dashboard_transaction
+            GROUP BY user_id, date_trunc('month', date)
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -22,4 +22,81 @@ class Transaction(models.Model):
     date = models.DateField()
 
     def __str__(self):
-        return f"{self.type.capitalize()} - {self.amount} on {self.date}"
\ No newline at end of file
+        return f"{self.type.capitalize()} - {self.amount} on {self.date}"
+
+
+class MonthlySummary(models.Model):
+    """Per-user income and expense totals per month, kept in sync by user_dashboard.services."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='monthly_summaries')
+    # Selalu tanggal 1 di bulan tersebut
+    month = models.DateField()
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'user'], name='unique_monthly_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.month:%Y-%m}"
+
+
+# SHARED EXPENSES
+class ExpenseGroup(models.Model):
+    name = models.CharField(max_length=100)
+    created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='created_expense_groups')
+    members = models.ManyToManyField(CustomUser, through='ExpenseGroupMember', related_name='expense_groups')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ExpenseGroupMember(models.Model):
+    group = models.ForeignKey(ExpenseGroup, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='expense_group_memberships')
+    # Positif: grup berhutang ke member ini, negatif: member ini berhutang ke grup.
+    # Diperbarui tiap expense, jadi settle up tidak perlu membaca riwayat expense.
+    net_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'user'], name='unique_expense_group_member'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.group}"
+
+
+class SharedExpense(models.Model):
+    group = models.ForeignKey(ExpenseGroup, on_delete=models.CASCADE, related_name='expenses')
+    paid_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='paid_shared_expenses')
+    # Transaksi pribadi pembayar untuk expense ini
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='shared_expense'
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.TextField(blank=True)
+    date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['group', '-created_at', '-id'], name='shared_expense_group_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.amount} paid by {self.paid_by} in {self.group}"
+
+
+class SharedExpenseShare(models.Model):
+    expense = models.ForeignKey(SharedExpense, on_delete=models.CASCADE, related_name='shares')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='shared_expense_shares')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['expense', 'user'], name='unique_shared_expense_share'),
+        ]
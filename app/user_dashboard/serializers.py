@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from .models import Transaction, Category
+from .models import Transaction, Category, ExpenseGroup, ExpenseGroupMember, SharedExpense, SharedExpenseShare
 from django.db.models import Sum, Count
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -35,3 +36,50 @@ class CategorySummarySerializer(serializers.Serializer):
     count = serializers.IntegerField()
     percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
 
+
+# SHARED EXPENSES
+class ExpenseGroupCreateSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    member_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=50)
+
+
+class ExpenseGroupMemberSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='user.id')
+    username = serializers.CharField(source='user.username')
+
+    class Meta:
+        model = ExpenseGroupMember
+        fields = ['id', 'username', 'net_balance']
+
+
+class ExpenseGroupSerializer(serializers.ModelSerializer):
+    members = ExpenseGroupMemberSerializer(source='memberships', many=True, read_only=True)
+
+    class Meta:
+        model = ExpenseGroup
+        fields = ['id', 'name', 'created_by', 'created_at', 'members']
+
+
+class SharedExpenseCreateSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    date = serializers.DateField()
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    # Default: dibagi rata ke semua member grup
+    participant_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    category_id = serializers.PrimaryKeyRelatedField(
+        queryset=Category.objects.all(), required=False, allow_null=True, source='category'
+    )
+
+
+class SharedExpenseShareSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SharedExpenseShare
+        fields = ['user', 'amount']
+
+
+class SharedExpenseSerializer(serializers.ModelSerializer):
+    shares = SharedExpenseShareSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = SharedExpense
+        fields = ['id', 'paid_by', 'transaction', 'amount', 'description', 'date', 'created_at', 'shares']
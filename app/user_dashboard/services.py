@@ -0,0 +1,171 @@
+import heapq
+from decimal import ROUND_DOWN, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, IntegerField, Value, When
+
+from authentication.auth import invalidate_cached_users
+from authentication.models import CustomUser
+from user.models import FriendEdge
+from user_dashboard.models import (
+    ExpenseGroup, ExpenseGroupMember, MonthlySummary, SharedExpense, SharedExpenseShare, Transaction
+)
+
+CENT = Decimal('0.01')
+
+# TRANSACTION
+def saldo_delta(type, amount):
+    return amount if type == 'income' else -amount
+
+def _add_to_monthly_summary(user_id, type, amount, date):
+    income, expense = (amount, 0) if type == 'income' else (0, amount)
+    table = MonthlySummary._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, month, income, expense) VALUES (%s, %s, %s, %s)
+            ON CONFLICT (month, user_id) DO UPDATE
+            SET income = {table}.income + EXCLUDED.income, expense = {table}.expense + EXCLUDED.expense
+            """,
+            [user_id, date.replace(day=1), income, expense]
+        )
+
+def apply_transaction(user_id, type, amount, date, sign=1):
+    """Apply (``sign=1``) or revert (``sign=-1``) a transaction on saldo and on its monthly summary."""
+    amount = sign * amount
+    # saldo adalah IntegerField, pecahan desimal dipotong seperti saat user.save()
+    CustomUser.objects.filter(id=user_id).update(
+        saldo=F('saldo') + Value(saldo_delta(type, amount), output_field=IntegerField())
+    )
+    invalidate_cached_users([user_id])
+    _add_to_monthly_summary(user_id, type, amount, date)
+
+def record_transaction(user_id, amount, type, date, description='', category=None):
+    """Create a personal transaction and apply it to the owner's saldo and monthly summary atomically."""
+    with transaction.atomic():
+        record = Transaction.objects.create(
+            user_id=user_id, amount=amount, type=type, date=date, description=description, category=category
+        )
+        apply_transaction(user_id, type, amount, date)
+    return record
+
+
+# LEADERBOARD
+def _leaderboard_key(user_id, month):
+    return f"friends_leaderboard:{user_id}:{month:%Y-%m}"
+
+def friends_leaderboard(user_id, month):
+    """
+    Rank the user and their friends by net savings (income - expense) for ``month``.
+    Reads one MonthlySummary row per friend and is cached per user for a short TTL; the
+    friend list itself is read from FriendEdge on every call and filters the cached rows.
+    """
+    # Cache per proses (tanpa REDIS_URL) bisa masih memuat teman yang sudah dihapus
+    user_ids = set(FriendEdge.objects.filter(user_id=user_id).values_list('friend_id', flat=True)) | {user_id}
+
+    key = _leaderboard_key(user_id, month)
+    built_for, rows = cache.get(key, (None, None))
+    # Teman baru belum ada di hasil cache: hitung ulang; teman yang dihapus cukup disaring
+    if rows is None or not user_ids <= built_for:
+        totals = {
+            row[0]: row[1:] for row in
+            MonthlySummary.objects.filter(month=month, user_id__in=user_ids).values_list('user_id', 'income', 'expense')
+        }
+        users = CustomUser.objects.filter(id__in=user_ids, is_active=True).values('id', 'username', 'avatar_id')
+
+        rows = []
+        for user in users:
+            income, expense = totals.get(user['id'], (Decimal('0.00'), Decimal('0.00')))
+            rows.append({**user, 'income': income, 'expense': expense, 'net_savings': income - expense})
+        rows.sort(key=lambda row: (-row['net_savings'], row['id']))
+        cache.set(key, (user_ids, rows), settings.FRIENDS_LEADERBOARD['CACHE_TTL'])
+
+    return [
+        {**row, 'rank': rank}
+        for rank, row in enumerate((row for row in rows if row['id'] in user_ids), start=1)
+    ]
+
+
+# SHARED EXPENSE
+def non_friend_ids(user_id, other_ids):
+    """Return the ids in ``other_ids`` that are not friends of ``user_id``."""
+    other_ids = set(other_ids) - {user_id}
+    friends = set(
+        FriendEdge.objects.filter(user_id=user_id, friend_id__in=other_ids).values_list('friend_id', flat=True)
+    )
+    return other_ids - friends
+
+def create_expense_group(creator_id, name, member_ids):
+    member_ids = set(member_ids) | {creator_id}
+    with transaction.atomic():
+        group = ExpenseGroup.objects.create(name=name, created_by_id=creator_id)
+        ExpenseGroupMember.objects.bulk_create(
+            [ExpenseGroupMember(group=group, user_id=user_id) for user_id in sorted(member_ids)]
+        )
+    return group
+
+def split_evenly(amount, user_ids):
+    """Split ``amount`` into per-user shares that add up exactly; leftover cents go to the lowest ids."""
+    user_ids = sorted(user_ids)
+    base = (amount / len(user_ids)).quantize(CENT, rounding=ROUND_DOWN)
+    leftover = int((amount - base * len(user_ids)) / CENT)
+    return {user_id: base + (CENT if index < leftover else 0) for index, user_id in enumerate(user_ids)}
+
+def add_shared_expense(group, paid_by_id, amount, date, description='', participant_ids=None, category=None):
+    """
+    Log an expense paid by one member and split evenly between ``participant_ids``
+    (all members by default). The payer gets a personal expense transaction for the
+    full amount and every affected member net is updated in one UPDATE.
+    """
+    if participant_ids is None:
+        participant_ids = group.memberships.values_list('user_id', flat=True)
+    shares = split_evenly(amount, participant_ids)
+
+    deltas = {user_id: -share for user_id, share in shares.items()}
+    deltas[paid_by_id] = deltas.get(paid_by_id, 0) + amount
+
+    with transaction.atomic():
+        record = record_transaction(
+            paid_by_id, amount, 'expense', date, description=description or f"Shared expense: {group.name}",
+            category=category,
+        )
+        expense = SharedExpense.objects.create(
+            group=group, paid_by_id=paid_by_id, transaction=record, amount=amount, description=description, date=date
+        )
+        SharedExpenseShare.objects.bulk_create(
+            [SharedExpenseShare(expense=expense, user_id=user_id, amount=share) for user_id, share in shares.items()]
+        )
+        ExpenseGroupMember.objects.filter(group=group, user_id__in=deltas.keys()).update(
+            net_balance=F('net_balance') + Case(
+                *[When(user_id=user_id, then=Value(delta)) for user_id, delta in deltas.items()],
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+    return expense
+
+def settle_up(nets):
+    """
+    Greedy settlement over ``{user_id: net}``: the largest debtor repeatedly pays the
+    largest creditor, so every step clears at least one member and a group of n
+    members settles in at most n - 1 transfers.
+    """
+    # heapq adalah min-heap, jadi saldo kreditur disimpan negatif
+    creditors = [(-net, user_id) for user_id, net in nets.items() if net > 0]
+    debtors = [(net, user_id) for user_id, net in nets.items() if net < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append({'from_user': debtor, 'to_user': creditor, 'amount': amount})
+
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+    return transfers
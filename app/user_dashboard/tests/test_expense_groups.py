@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from authentication.models import CustomUser
+from user.services import link_friends
+from user_dashboard.models import ExpenseGroupMember, SharedExpense, Transaction
+from user_dashboard.services import settle_up, split_evenly
+
+
+class SettleUpAlgorithmTests(TestCase):
+    def test_split_evenly_adds_up(self):
+        shares = split_evenly(Decimal('100.00'), [3, 1, 2])
+        self.assertEqual(sum(shares.values()), Decimal('100.00'))
+        self.assertEqual(shares[1], Decimal('33.34'))
+        self.assertEqual(shares[3], Decimal('33.33'))
+
+    def test_transfers_clear_all_balances(self):
+        nets = {1: Decimal('50'), 2: Decimal('-30'), 3: Decimal('-20'), 4: Decimal('10'), 5: Decimal('-10')}
+        transfers = settle_up(nets)
+
+        remaining = dict(nets)
+        for transfer in transfers:
+            remaining[transfer['from_user']] += transfer['amount']
+            remaining[transfer['to_user']] -= transfer['amount']
+        self.assertTrue(all(value == 0 for value in remaining.values()))
+        self.assertLessEqual(len(transfers), len(nets) - 1)
+
+    def test_settled_group_needs_no_transfers(self):
+        self.assertEqual(settle_up({1: Decimal('0'), 2: Decimal('0')}), [])
+
+
+class ExpenseGroupAPITests(TestCase):
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user(username='alice', email='alice@example.com', password='Pass123!')
+        self.bob = CustomUser.objects.create_user(username='bob', email='bob@example.com', password='Pass123!')
+        self.carol = CustomUser.objects.create_user(username='carol', email='carol@example.com', password='Pass123!')
+        self.stranger = CustomUser.objects.create_user(username='stranger', email='s@example.com', password='Pass123!')
+        link_friends(self.alice.id, [self.bob.id, self.carol.id])
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.alice)
+        self.groups_url = reverse('user_dashboard:expense-group-list-create')
+
+    def create_group(self, member_ids):
+        response = self.client.post(self.groups_url, {'name': 'Trip', 'member_ids': member_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['data']['id']
+
+    def add_expense(self, user, group_id, amount, **extra):
+        self.client.force_authenticate(user=user)
+        url = reverse('user_dashboard:shared-expense-list-create', kwargs={'pk': group_id})
+        return self.client.post(url, {'amount': amount, 'date': '2025-05-01', **extra}, format='json')
+
+    def test_members_must_be_friends(self):
+        response = self.client.post(
+            self.groups_url, {'name': 'Trip', 'member_ids': [self.bob.id, self.stranger.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['data']['member_ids'], [self.stranger.id])
+
+    def test_create_group_includes_creator(self):
+        group_id = self.create_group([self.bob.id, self.carol.id])
+        members = ExpenseGroupMember.objects.filter(group_id=group_id).values_list('user_id', flat=True)
+        self.assertEqual(set(members), {self.alice.id, self.bob.id, self.carol.id})
+
+    def test_expense_updates_nets_and_payer_transaction(self):
+        group_id = self.create_group([self.bob.id, self.carol.id])
+
+        response = self.add_expense(self.alice, group_id, '90.00', description='Dinner')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        nets = dict(ExpenseGroupMember.objects.filter(group_id=group_id).values_list('user_id', 'net_balance'))
+        self.assertEqual(nets, {self.alice.id: Decimal('60.00'), self.bob.id: Decimal('-30.00'), self.carol.id: Decimal('-30.00')})
+
+        expense = SharedExpense.objects.get(pk=response.data['data']['id'])
+        self.assertEqual(expense.transaction.user_id, self.alice.id)
+        self.assertEqual(expense.transaction.type, 'expense')
+        self.assertEqual(expense.transaction.amount, Decimal('90.00'))
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.saldo, -90)
+        self.assertFalse(Transaction.objects.filter(user=self.bob).exists())
+
+    def test_participants_must_be_members(self):
+        group_id = self.create_group([self.bob.id])
+        response = self.add_expense(self.alice, group_id, '10.00', participant_ids=[self.bob.id, self.carol.id])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_settle_up_across_expenses(self):
+        group_id = self.create_group([self.bob.id, self.carol.id])
+        self.add_expense(self.alice, group_id, '90.00')
+        self.add_expense(self.bob, group_id, '30.00', participant_ids=[self.bob.id, self.carol.id])
+
+        self.client.force_authenticate(user=self.carol)
+        response = self.client.get(reverse('user_dashboard:expense-group-settle-up', kwargs={'pk': group_id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # alice +60, bob -30 + 15 = -15, carol -30 - 15 = -45
+        transfers = response.data['data']['transfers']
+        self.assertEqual(
+            sorted((t['from_user'], t['to_user'], t['amount']) for t in transfers),
+            sorted([(self.carol.id, self.alice.id, Decimal('45.00')), (self.bob.id, self.alice.id, Decimal('15.00'))])
+        )
+
+    def test_non_member_cannot_see_group(self):
+        group_id = self.create_group([self.bob.id])
+        self.client.force_authenticate(user=self.carol)
+        response = self.client.get(reverse('user_dashboard:expense-group-detail', kwargs={'pk': group_id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.add_expense(self.carol, group_id, '10.00')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_expenses_paginated(self):
+        group_id = self.create_group([self.bob.id])
+        for _ in range(3):
+            self.add_expense(self.alice, group_id, '10.00')
+
+        url = reverse('user_dashboard:shared-expense-list-create', kwargs={'pk': group_id})
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(len(response.data['data']['results']), 2)
+        response = self.client.get(url, {'page_size': 2, 'cursor': response.data['data']['next_cursor']})
+        self.assertEqual(len(response.data['data']['results']), 1)
+        self.assertIsNone(response.data['data']['next_cursor'])
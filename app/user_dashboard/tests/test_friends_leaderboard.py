@@ -0,0 +1,111 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from authentication.models import CustomUser
+from user.models import FriendEdge
+from user.services import link_friends
+from user_dashboard.models import Category, MonthlySummary, Transaction
+
+
+class MonthlySummaryTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='saver', email='saver@example.com', password='Pass123!')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('user_dashboard:transaction-list-create')
+        self.category = Category.objects.create(name='General', user=self.user)
+
+    def summary(self, month):
+        row = MonthlySummary.objects.get(user=self.user, month=month)
+        return row.income, row.expense
+
+    def post(self, **data):
+        return self.client.post(self.url, {'user': self.user.id, 'category_id': self.category.id, **data})
+
+    def test_create_update_delete_keep_summary_in_sync(self):
+        self.post(amount='100.00', type='income', date='2025-03-10')
+        response = self.post(amount='40.00', type='expense', date='2025-03-12')
+        self.assertEqual(self.summary(date(2025, 3, 1)), (Decimal('100.00'), Decimal('40.00')))
+
+        # Pindah bulan: bulan lama dikurangi, bulan baru ditambah
+        detail_url = reverse('user_dashboard:transaction-detail', kwargs={'pk': response.data['data']['id']})
+        self.client.patch(detail_url, {'date': '2025-04-01', 'amount': '25.00'})
+        self.assertEqual(self.summary(date(2025, 3, 1)), (Decimal('100.00'), Decimal('0.00')))
+        self.assertEqual(self.summary(date(2025, 4, 1)), (Decimal('0.00'), Decimal('25.00')))
+
+        self.client.delete(detail_url)
+        self.assertEqual(self.summary(date(2025, 4, 1)), (Decimal('0.00'), Decimal('0.00')))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.saldo, 100)
+
+    def test_rebuild_command_matches_transactions(self):
+        Transaction.objects.create(user=self.user, amount=Decimal('70.00'), type='income', date=date(2025, 1, 5))
+        Transaction.objects.create(user=self.user, amount=Decimal('20.00'), type='expense', date=date(2025, 1, 9))
+        MonthlySummary.objects.create(user=self.user, month=date(2024, 12, 1), income=Decimal('999'))
+
+        call_command('rebuild_monthly_summaries', stdout=StringIO())
+
+        self.assertFalse(MonthlySummary.objects.filter(month=date(2024, 12, 1)).exists())
+        self.assertEqual(self.summary(date(2025, 1, 1)), (Decimal('70.00'), Decimal('20.00')))
+
+
+class FriendsLeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='me', email='me@example.com', password='Pass123!')
+        self.rich = CustomUser.objects.create_user(username='rich', email='rich@example.com', password='Pass123!')
+        self.idle = CustomUser.objects.create_user(username='idle', email='idle@example.com', password='Pass123!')
+        self.stranger = CustomUser.objects.create_user(username='stranger', email='s@example.com', password='Pass123!')
+        link_friends(self.user.id, [self.rich.id, self.idle.id])
+
+        month = date(2025, 5, 1)
+        MonthlySummary.objects.create(user=self.user, month=month, income=Decimal('100'), expense=Decimal('60'))
+        MonthlySummary.objects.create(user=self.rich, month=month, income=Decimal('500'), expense=Decimal('100'))
+        MonthlySummary.objects.create(user=self.stranger, month=month, income=Decimal('9999'))
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('user_dashboard:statistics-friends-leaderboard')
+
+    def test_ranks_friends_by_net_savings(self):
+        response = self.client.get(self.url, {'month': '2025-05'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data['data']['results']
+        self.assertEqual([row['id'] for row in results], [self.rich.id, self.user.id, self.idle.id])
+        self.assertEqual(results[0]['net_savings'], Decimal('400'))
+        self.assertEqual(results[2]['net_savings'], Decimal('0'))
+        self.assertEqual(response.data['data']['my_rank'], 2)
+
+    def test_result_is_cached(self):
+        self.client.get(self.url, {'month': '2025-05'})
+        # Hanya daftar teman saat ini yang dibaca ulang
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'month': '2025-05'})
+        self.assertEqual(len(response.data['data']['results']), 3)
+
+    def test_cached_result_follows_current_friends(self):
+        self.client.get(self.url, {'month': '2025-05'})
+        # Pertemanan diubah di worker lain; cache di sini tidak ikut dihapus
+        FriendEdge.objects.filter(user=self.user, friend=self.rich).delete()
+        FriendEdge.objects.create(user=self.user, friend=self.stranger)
+
+        results = self.client.get(self.url, {'month': '2025-05'}).data['data']['results']
+        self.assertEqual([row['id'] for row in results], [self.stranger.id, self.user.id, self.idle.id])
+        self.assertEqual([row['rank'] for row in results], [1, 2, 3])
+
+        FriendEdge.objects.filter(user=self.user, friend=self.stranger).delete()
+        results = self.client.get(self.url, {'month': '2025-05'}).data['data']['results']
+        self.assertEqual([(row['id'], row['rank']) for row in results], [(self.user.id, 1), (self.idle.id, 2)])
+
+    def test_invalid_month(self):
+        response = self.client.get(self.url, {'month': 'May'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -16,4 +16,11 @@ urlpatterns = [
     path('statistics/summary', StatisticsSummaryView.as_view(), name='statistics-summary'),
     path('statistics/categories', CategoryStatisticsView.as_view(), name='statistics-categories'),
     path('statistics/monthly-trends', MonthlyTrendsView.as_view(), name='statistics-monthly-trends'),
+    path('statistics/friends-leaderboard', FriendsLeaderboardView.as_view(), name='statistics-friends-leaderboard'),
+
+    # Shared expense endpoints
+    path('groups/', ExpenseGroupListCreateView.as_view(), name='expense-group-list-create'),
+    path('groups/<int:pk>/', ExpenseGroupDetailView.as_view(), name='expense-group-detail'),
+    path('groups/<int:pk>/expenses/', SharedExpenseListCreateView.as_view(), name='shared-expense-list-create'),
+    path('groups/<int:pk>/settle-up', SettleUpView.as_view(), name='expense-group-settle-up'),
 ]
\ No newline at end of file
@@ -2,14 +2,17 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
-from .models import Transaction, Category
+from .models import Transaction, Category, ExpenseGroup, ExpenseGroupMember
 from .serializers import TransactionSerializer, CategorySerializer, TransactionSummarySerializer, PeriodSummarySerializer, CategorySummarySerializer
-from utils import api_response
+from .serializers import ExpenseGroupCreateSerializer, ExpenseGroupSerializer, SharedExpenseCreateSerializer, SharedExpenseSerializer
+from .services import add_shared_expense, apply_transaction, create_expense_group, friends_leaderboard, non_friend_ids, settle_up
+from utils import InvalidCursor, api_response, get_page_size, keyset_paginate
 from django.shortcuts import get_object_or_404
+from django.db import transaction as db_transaction
 from decimal import Decimal
 
 
-from django.db.models import Sum, Count, F, Q
+from django.db.models import Sum, Count, F, Q, Prefetch
 from django.db.models.functions import TruncMonth, TruncYear, TruncWeek
 from datetime import datetime, timedelta
 import calendar
@@ -26,17 +29,10 @@ class TransactionListCreateView(APIView):
     def post(self, request):
         serializer = TransactionSerializer(data=request.data)
         if serializer.is_valid():
-            transaction = serializer.save(user=request.user)
-
-            # Update saldo
-            user = request.user
-            if transaction.type == "income":
-                user.saldo += Decimal(transaction.amount)
-            elif transaction.type == "expense":
-                user.saldo -= Decimal(transaction.amount)
-            user.save()
-
-            user.refresh_from_db()
+            # Update saldo dan ringkasan bulanan bersama transaksinya
+            with db_transaction.atomic():
+                transaction = serializer.save(user=request.user)
+                apply_transaction(request.user.id, transaction.type, transaction.amount, transaction.date)
 
             return api_response(status.HTTP_201_CREATED, "Transaction added", serializer.data)
         return api_response(status.HTTP_400_BAD_REQUEST, "Invalid data", serializer.errors)
@@ -49,24 +45,18 @@ class TransactionDetailView(APIView):
         transaction = get_object_or_404(Transaction, pk=pk, user=request.user)
         old_amount = transaction.amount
         old_type = transaction.type
+        old_date = transaction.date
 
         serializer = TransactionSerializer(transaction, data=request.data, partial=True)
         if serializer.is_valid():
-            updated_transaction = serializer.save()
-
-            # Undo old saldo
-            user = request.user
-            if old_type == "income":
-                user.saldo -= old_amount
-            elif old_type == "expense":
-                user.saldo += old_amount
-
-            # Apply new saldo
-            if updated_transaction.type == "income":
-                user.saldo += updated_transaction.amount
-            elif updated_transaction.type == "expense":
-                user.saldo -= updated_transaction.amount
-            user.save()
+            with db_transaction.atomic():
+                updated_transaction = serializer.save()
+
+                # Undo old saldo, apply new saldo
+                apply_transaction(request.user.id, old_type, old_amount, old_date, sign=-1)
+                apply_transaction(
+                    request.user.id, updated_transaction.type, updated_transaction.amount, updated_transaction.date
+                )
 
             return api_response(status.HTTP_200_OK, "Transaction updated", serializer.data)
         return api_response(status.HTTP_400_BAD_REQUEST, "Invalid data", serializer.errors)
@@ -75,14 +65,9 @@ class TransactionDetailView(APIView):
         transaction = get_object_or_404(Transaction, pk=pk, user=request.user)
 
         # Undo saldo impact
-        user = request.user
-        if transaction.type == "income":
-            user.saldo -= transaction.amount
-        elif transaction.type == "expense":
-            user.saldo += transaction.amount
-        user.save()
-
-        transaction.delete()
+        with db_transaction.atomic():
+            apply_transaction(request.user.id, transaction.type, transaction.amount, transaction.date, sign=-1)
+            transaction.delete()
         return api_response(status.HTTP_200_OK, "Transaction deleted")
     
 class CategoryListCreateView(APIView):
@@ -295,3 +280,146 @@ class MonthlyTrendsView(APIView):
         ).values('month').annotate(
             total=Sum('amount')
         ).order_by('month'))
+
+
+class FriendsLeaderboardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Rank the user and their friends by net savings for a month (?month=YYYY-MM, default this month)"""
+        month = request.query_params.get('month')
+        try:
+            month = datetime.strptime(month, '%Y-%m').date() if month else datetime.today().date().replace(day=1)
+        except ValueError:
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid month")
+
+        ranking = friends_leaderboard(request.user.id, month)
+        data = {
+            'month': month.strftime('%Y-%m'),
+            'my_rank': next((row['rank'] for row in ranking if row['id'] == request.user.id), None),
+            'results': ranking,
+        }
+        return api_response(status.HTTP_200_OK, f"Friends leaderboard for {month.strftime('%B %Y')}", data)
+
+
+# SHARED EXPENSES
+def get_member_group(user, pk, with_members=False):
+    groups = ExpenseGroup.objects.filter(pk=pk, memberships__user=user)
+    if with_members:
+        groups = prefetch_members(groups)
+    return groups.first()
+
+def prefetch_members(groups):
+    return groups.prefetch_related(
+        Prefetch('memberships', queryset=ExpenseGroupMember.objects.select_related('user').order_by('user_id'))
+    )
+
+
+class ExpenseGroupListCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        groups = prefetch_members(ExpenseGroup.objects.filter(memberships__user=request.user)).order_by('-created_at', '-id')
+        serializer = ExpenseGroupSerializer(groups, many=True)
+        return api_response(status.HTTP_200_OK, "Expense groups retrieved", serializer.data)
+
+    def post(self, request):
+        serializer = ExpenseGroupCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid data", serializer.errors)
+
+        member_ids = serializer.validated_data['member_ids']
+        # Member grup harus sudah berteman dengan pembuat grup
+        not_friends = non_friend_ids(request.user.id, member_ids)
+        if not_friends:
+            return api_response(
+                status.HTTP_400_BAD_REQUEST, "Members must be your friends", {'member_ids': sorted(not_friends)}
+            )
+
+        group = create_expense_group(request.user.id, serializer.validated_data['name'], member_ids)
+        group = get_member_group(request.user, group.pk, with_members=True)
+        return api_response(status.HTTP_201_CREATED, "Expense group created", ExpenseGroupSerializer(group).data)
+
+
+class ExpenseGroupDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        group = get_member_group(request.user, pk, with_members=True)
+        if not group:
+            return api_response(status.HTTP_404_NOT_FOUND, "Expense group not found")
+        serializer = ExpenseGroupSerializer(group)
+        return api_response(status.HTTP_200_OK, "Expense group retrieved", serializer.data)
+
+
+class SharedExpenseListCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        group = get_member_group(request.user, pk)
+        if not group:
+            return api_response(status.HTTP_404_NOT_FOUND, "Expense group not found")
+
+        try:
+            expenses, next_cursor = keyset_paginate(
+                group.expenses.prefetch_related('shares'), ('-created_at', '-id'),
+                cursor=request.query_params.get('cursor'),
+                page_size=get_page_size(request),
+            )
+        except InvalidCursor:
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+        data = {
+            'results': SharedExpenseSerializer(expenses, many=True).data,
+            'next_cursor': next_cursor,
+        }
+        return api_response(status.HTTP_200_OK, "Shared expenses retrieved", data)
+
+    def post(self, request, pk):
+        group = get_member_group(request.user, pk)
+        if not group:
+            return api_response(status.HTTP_404_NOT_FOUND, "Expense group not found")
+
+        serializer = SharedExpenseCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid data", serializer.errors)
+        data = serializer.validated_data
+
+        category = data.get('category')
+        if category is not None and category.user_id != request.user.id:
+            return api_response(status.HTTP_400_BAD_REQUEST, "Invalid data", {'category_id': ["Category not found"]})
+
+        participant_ids = data.get('participant_ids')
+        if participant_ids is not None:
+            participant_ids = set(participant_ids)
+            outsiders = participant_ids - set(group.memberships.values_list('user_id', flat=True))
+            if outsiders:
+                return api_response(
+                    status.HTTP_400_BAD_REQUEST, "Participants must be group members",
+                    {'participant_ids': sorted(outsiders)}
+                )
+
+        # Yang mencatat expense adalah yang membayar
+        expense = add_shared_expense(
+            group, request.user.id, data['amount'], data['date'], description=data['description'],
+            participant_ids=participant_ids, category=category,
+        )
+        return api_response(status.HTTP_201_CREATED, "Shared expense added", SharedExpenseSerializer(expense).data)
+
+
+class SettleUpView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        group = get_member_group(request.user, pk)
+        if not group:
+            return api_response(status.HTTP_404_NOT_FOUND, "Expense group not found")
+
+        # Cukup membaca net per member, bukan seluruh riwayat expense
+        nets = dict(group.memberships.values_list('user_id', 'net_balance'))
+        transfers = settle_up(nets)
+        data = {
+            'balances': [{'user': user_id, 'net_balance': net} for user_id, net in sorted(nets.items())],
+            'transfers': transfers,
+        }
+        return api_response(status.HTTP_200_OK, "Settlement computed", data)
@@ -1,4 +1,20 @@
+import asyncio
+import base64
+import datetime
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Q
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Di bawah estimasi ini COUNT(*) masih murah, jadi hitungan exact yang dipakai
+EXACT_COUNT_THRESHOLD = 10000
 
 def api_response(status_code, message, data=None):
     if data is None:
@@ -8,3 +24,119 @@ def api_response(status_code, message, data=None):
         "message": message,
         "data": data
     }, status=status_code)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with ``async def`` handlers, served without blocking the event loop under ASGI.
+    DRF's ``dispatch`` is sync, so this runs the same steps around an awaited handler.
+    ``initial()`` (authentication, permissions, throttles) may hit the database or cache
+    and runs in a thread; handlers wrap their own database work in ``sync_to_async``.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS dan method-not-allowed bawaan DRF tetap sync
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+# KEYSET PAGINATION
+class InvalidCursor(ValueError):
+    pass
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder memotong mikrodetik, padahal cursor butuh nilai persis
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=CursorEncoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE):
+    try:
+        page_size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+def _keyset_filter(ordering, values):
+    # (a, b) setelah cursor: a > va OR (a = va AND b > vb), arah mengikuti ordering
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+def _row_value(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of ``queryset`` ordered by ``ordering`` and the cursor of the next page.
+    The last ordering field must be unique (usually ``id``) so the order is total.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(ordering):
+            raise InvalidCursor("Invalid cursor")
+        try:
+            queryset = queryset.filter(_keyset_filter(ordering, values))
+        except (ValueError, TypeError, ValidationError):
+            raise InvalidCursor("Invalid cursor")
+
+    rows = list(queryset.order_by(*ordering)[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([_row_value(rows[-1], field.lstrip('-')) for field in ordering])
+    return rows, next_cursor
+
+
+def approximate_count(model):
+    """
+    Row count of ``model``'s table from the planner statistics (``pg_class.reltuples``), and
+    whether it is approximate. Small or never-analyzed tables fall back to an exact count.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    estimate = row[0] if row else -1
+    if estimate < EXACT_COUNT_THRESHOLD:
+        return model._default_manager.count(), False
+    return estimate, True